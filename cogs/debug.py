@@ -0,0 +1,249 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+import asyncio
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from utils.metrics import metrics
+
+logger = logging.getLogger("discord_bot")
+
+
+class StackSampler:
+    """Samples the event loop thread's stack at a fixed interval"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start sampling in a background thread"""
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the sampler thread to exit"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            parts = []
+            while frame is not None:
+                code = frame.f_code
+                parts.append(f"{code.co_filename}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+
+            self.stacks[';'.join(reversed(parts))] += 1
+            self.samples += 1
+
+    def render(self) -> str:
+        """Render samples in collapsed stack format (compatible with flamegraph tools)"""
+        return '\n'.join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+class DebugCog(commands.Cog):
+    """Owner-only diagnostics for profiling the running bot"""
+
+    debug = app_commands.Group(
+        name='debug',
+        description='Owner-only profiling and diagnostics',
+        default_permissions=discord.Permissions(administrator=True)
+    )
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.profiler: Optional[cProfile.Profile] = None
+        self.sampler: Optional[StackSampler] = None
+        self.profile_started_at = 0.0
+        self.last_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Restrict every command in this cog to the bot owner"""
+        if await self.bot.is_owner(interaction.user):
+            return True
+        await interaction.response.send_message("❌ This command is restricted to the bot owner.", ephemeral=True)
+        return False
+
+    def cog_unload(self):
+        """Make sure no profiler is left running when the cog is unloaded"""
+        if self.profiler:
+            self.profiler.disable()
+        if self.sampler:
+            self.sampler.stop()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @staticmethod
+    def make_file(content: str, name: str) -> discord.File:
+        """Wrap text output in an attachable file"""
+        timestamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+        return discord.File(io.BytesIO(content.encode('utf-8')), filename=f"{name}-{timestamp}.txt")
+
+    @debug.command(name='profile_start', description='Start a profiling session')
+    @app_commands.describe(mode='cProfile traces every call, sample periodically captures the loop stack')
+    @app_commands.choices(mode=[
+        app_commands.Choice(name='sample', value='sample'),
+        app_commands.Choice(name='cprofile', value='cprofile'),
+    ])
+    async def profile_start(self, interaction: discord.Interaction, mode: str = 'sample'):
+        """Start a cProfile or sampling session"""
+        if self.profiler or self.sampler:
+            await interaction.response.send_message("❌ A profiling session is already running!", ephemeral=True)
+            return
+
+        if mode == 'cprofile':
+            # cProfile only traces the thread that enables it, which is the event loop thread
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.sampler = StackSampler(threading.get_ident())
+            self.sampler.start()
+
+        self.profile_started_at = time.monotonic()
+        logger.info("Profiling session started (%s) by %s", mode, interaction.user)
+        await interaction.response.send_message(f"🔬 Started **{mode}** profiling session", ephemeral=True)
+
+    @debug.command(name='profile_stop', description='Stop the profiling session and upload the results')
+    async def profile_stop(self, interaction: discord.Interaction):
+        """Stop the running profiling session and attach the results"""
+        elapsed = time.monotonic() - self.profile_started_at
+        files = []
+
+        if self.profiler:
+            self.profiler.disable()
+            profiler, self.profiler = self.profiler, None
+
+            output = io.StringIO()
+            stats = pstats.Stats(profiler, stream=output)
+            stats.sort_stats('cumulative').print_stats(50)
+            files.append(self.make_file(output.getvalue(), 'cprofile'))
+            files.append(discord.File(io.BytesIO(marshal.dumps(stats.stats)), filename='cprofile.prof'))
+
+        elif self.sampler:
+            self.sampler.stop()
+            sampler, self.sampler = self.sampler, None
+            files.append(self.make_file(sampler.render(), 'samples'))
+
+        else:
+            await interaction.response.send_message("❌ No profiling session is running!", ephemeral=True)
+            return
+
+        logger.info("Profiling session stopped after %.1fs", elapsed)
+        await interaction.response.send_message(
+            f"🔬 Profiling session finished after {elapsed:.1f}s", files=files, ephemeral=True
+        )
+
+    @debug.command(name='memory_snapshot', description='Take a tracemalloc snapshot and diff it against the previous one')
+    async def memory_snapshot(self, interaction: discord.Interaction):
+        """Take a memory snapshot, starting tracemalloc on first use"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self.last_snapshot = None
+            await interaction.response.send_message(
+                "🧠 Started tracemalloc, run this command again to get a diff", ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        previous = self.last_snapshot
+        loop = asyncio.get_running_loop()
+        snapshot = await loop.run_in_executor(None, tracemalloc.take_snapshot)
+        self.last_snapshot = snapshot
+
+        def build_report() -> str:
+            current, peak = tracemalloc.get_traced_memory()
+            lines = [f"Traced memory: current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB", ""]
+
+            if previous is not None:
+                lines.append("Top allocation growth since previous snapshot:")
+                for stat in snapshot.compare_to(previous, 'lineno')[:25]:
+                    lines.append(str(stat))
+                lines.append("")
+
+            lines.append("Top allocations:")
+            for stat in snapshot.statistics('lineno')[:25]:
+                lines.append(str(stat))
+            return '\n'.join(lines)
+
+        report = await loop.run_in_executor(None, build_report)
+        await interaction.followup.send("🧠 Memory snapshot", file=self.make_file(report, 'memory'), ephemeral=True)
+
+    @debug.command(name='memory_stop', description='Stop tracemalloc and discard snapshots')
+    async def memory_stop(self, interaction: discord.Interaction):
+        """Stop tracing allocations"""
+        if not tracemalloc.is_tracing():
+            await interaction.response.send_message("❌ tracemalloc is not running!", ephemeral=True)
+            return
+
+        tracemalloc.stop()
+        self.last_snapshot = None
+        await interaction.response.send_message("🧠 Stopped tracemalloc", ephemeral=True)
+
+    @debug.command(name='tasks', description='Dump running asyncio tasks grouped by coroutine')
+    async def tasks(self, interaction: discord.Interaction):
+        """Count running tasks per coroutine and attach their stacks"""
+        all_tasks = asyncio.all_tasks()
+        counts = Counter(task.get_coro().__qualname__ for task in all_tasks)
+
+        output = io.StringIO()
+        output.write(f"{len(all_tasks)} task(s)\n\n")
+        for name, count in counts.most_common():
+            output.write(f"{count:5d}  {name}\n")
+
+        output.write("\n")
+        for task in all_tasks:
+            output.write(f"--- {task.get_name()} ---\n")
+            task.print_stack(limit=10, file=output)
+
+        await interaction.response.send_message(
+            f"📋 {len(all_tasks)} running task(s)", file=self.make_file(output.getvalue(), 'tasks'), ephemeral=True
+        )
+
+    @debug.command(name='loop', description='Show event loop lag statistics')
+    async def loop_stats(self, interaction: discord.Interaction):
+        """Show the watchdog's lag histogram"""
+        await interaction.response.send_message(f"```{self.bot.watchdog.summary()}```", ephemeral=True)
+
+    @debug.command(name='metrics', description='Show internal counters')
+    async def metrics_stats(self, interaction: discord.Interaction):
+        """Show the shared metrics registry"""
+        text = metrics.summary()
+
+        music_cog = self.bot.get_cog('MusicCog')
+        if music_cog:
+            text += f"\n\nSearch latency:\n{music_cog.search.summary()}"
+
+            cache = music_cog.stream_cache
+            lookups = cache.hits + cache.misses
+            hit_rate = f"{cache.hits / lookups:.0%}" if lookups else "n/a"
+            text += f"\n\nStream cache: {len(cache.entries)} entries, {cache.hits}/{lookups} hits ({hit_rate})"
+            text += f"\n{music_cog.warmer.summary()}"
+        await interaction.response.send_message(f"```{text}```", ephemeral=True)
+
+
+async def setup(bot):
+    """Setup function for the cog"""
+    await bot.add_cog(DebugCog(bot))
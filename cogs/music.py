@@ -8,21 +8,117 @@ import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
 from collections import deque
 import re
-from typing import Optional
+from typing import List, Optional
+from urllib.parse import urlparse, parse_qs
 from utils.config import Config
+from utils.hedge import HedgedResolver
+from utils.logger import log_stage
+from utils.loudness import LoudnessAnalyzer
+from utils.metrics import metrics
+from utils.prewarm import AudioCache, CacheWarmer
+from utils.stream_cache import StreamCache
+from utils.title_index import TitleIndex
 
 logger = logging.getLogger("discord_bot")
 
+# Options shared by every yt-dlp extraction
+YTDL_OPTIONS = {
+    'format': 'bestaudio/best',
+    'quiet': True,
+    'no_warnings': True,
+    'extract_flat': False,
+    'nocheckcertificate': True,
+    'ignoreerrors': False,
+    'logtostderr': False,
+    'no_color': True,
+    'source_address': '0.0.0.0',
+}
+
+YOUTUBE_HOSTS = ('youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com', 'youtu.be')
+
+
+class TrackedAudio(discord.PCMVolumeTransformer):
+    """Volume transformer that keeps track of the playback position"""
+
+    FRAME_SECONDS = discord.opus.Encoder.FRAME_LENGTH / 1000
+
+    def __init__(self, original, volume: float = 1.0, start_offset: float = 0.0):
+        super().__init__(original, volume=volume)
+        self.start_offset = start_offset
+        self.frames = 0
+
+    @property
+    def position(self) -> float:
+        """Seconds into the track, including the offset playback started from"""
+        return self.start_offset + self.frames * self.FRAME_SECONDS
+
+    def read(self) -> bytes:
+        data = super().read()
+        if data:
+            self.frames += 1
+        return data
+
+
+def extract_stream_info(url: str) -> dict:
+    """Fully extract a single video, including its stream URL (blocking)"""
+    with yt_dlp.YoutubeDL({**YTDL_OPTIONS, 'noplaylist': True}) as ytdl:
+        return ytdl.extract_info(url, download=False)
+
 
 class Song:
     """Represents a song in the queue"""
 
-    def __init__(self, title: str, url: str, duration: int, thumbnail: str, requester: discord.Member):
+    def __init__(self, title: str, url: str, duration: int, thumbnail: str, requester: discord.Member,
+                 resolved: bool = True):
         self.title = title
         self.url = url
         self.duration = duration
         self.thumbnail = thumbnail
         self.requester = requester
+        self.resolved = resolved  # False for flat playlist entries with partial metadata
+
+    @classmethod
+    def from_info(cls, info: dict, requester: discord.Member) -> 'Song':
+        """Create a song from a fully extracted yt-dlp info dict"""
+        return cls(
+            title=info.get('title', 'Unknown'),
+            url=info.get('webpage_url', info.get('url')),
+            duration=int(info.get('duration') or 0),
+            thumbnail=info.get('thumbnail'),
+            requester=requester
+        )
+
+    @classmethod
+    def from_flat_entry(cls, entry: dict, requester: discord.Member) -> 'Song':
+        """Create a lightweight song from a flat playlist entry"""
+        video_id = entry.get('id')
+        thumbnails = entry.get('thumbnails') or []
+        return cls(
+            title=entry.get('title') or 'Unknown',
+            url=f"https://www.youtube.com/watch?v={video_id}" if video_id else entry.get('url'),
+            duration=int(entry.get('duration') or 0),
+            thumbnail=thumbnails[-1].get('url') if thumbnails else None,
+            requester=requester,
+            resolved=False
+        )
+
+    @classmethod
+    def from_cache(cls, url: str, track: dict, requester: discord.Member) -> 'Song':
+        """Create a song from metadata stored in the track cache"""
+        return cls(
+            title=track['title'],
+            url=url,
+            duration=int(track.get('duration') or 0),
+            thumbnail=track.get('thumbnail'),
+            requester=requester
+        )
+
+    def update_from_info(self, info: dict):
+        """Fill in full metadata once the song has been extracted"""
+        self.title = info.get('title', self.title)
+        self.duration = int(info.get('duration') or self.duration)
+        self.thumbnail = info.get('thumbnail', self.thumbnail)
+        self.resolved = True
 
     def format_duration(self) -> str:
         """Format duration in seconds to MM:SS"""
@@ -68,7 +164,7 @@ class MusicControlView(discord.ui.View):
             await interaction.response.send_message("❌ Nothing is playing!", ephemeral=True)
             return
 
-        player.voice_client.stop()
+        player.stop_current()
         await interaction.response.send_message("⏭️ Skipped!", ephemeral=True)
 
     @discord.ui.button(label="⏹️ Stop", style=discord.ButtonStyle.danger, custom_id="music_stop")
@@ -76,9 +172,9 @@ class MusicControlView(discord.ui.View):
         player = self.music_cog.get_player(interaction.guild.id)
 
         if player.voice_client:
-            player.queue.clear()
+            player.clear()
             player.current = None
-            player.voice_client.stop()
+            player.stop_current()
             await player.voice_client.disconnect()
             player.voice_client = None
             await interaction.response.send_message("⏹️ Stopped and disconnected!", ephemeral=True)
@@ -180,10 +276,19 @@ class VolumeModal(discord.ui.Modal, title='Set Volume'):
 class MusicPlayer:
     """Music player for a guild"""
 
-    def __init__(self, guild_id: int, bot):
+    def __init__(self, guild_id: int, bot, stream_cache: StreamCache, loudness: LoudnessAnalyzer,
+                 warmer: CacheWarmer):
         self.guild_id = guild_id
         self.bot = bot
+        self.stream_cache = stream_cache
+        self.loudness = loudness
+        self.warmer = warmer
         self.queue = deque()
+        self.generation = 0  # Bumped whenever the queue is cleared so background loaders stop
+        self.resolving = {}  # song url -> in-flight resolve task
+        self.source: Optional[TrackedAudio] = None
+        self.stop_requested = False  # Set when playback is stopped on purpose (skip/stop)
+        self.failover_attempts = 0
         self.current = None
         self.voice_client: Optional[discord.VoiceClient] = None
         self.loop = False
@@ -195,19 +300,88 @@ class MusicPlayer:
         """Check if audio is currently playing"""
         return self.voice_client and self.voice_client.is_playing()
 
+    @property
+    def position(self) -> float:
+        """Playback position of the current song in seconds"""
+        return self.source.position if self.source else 0.0
+
+    def stop_current(self):
+        """Stop the current song on purpose, so it is not treated as a failed stream"""
+        self.stop_requested = True
+        if self.voice_client:
+            self.voice_client.stop()
+
+    def start_playback(self, source: TrackedAudio):
+        """Hand a source to the voice client"""
+        self.source = source
+        self.stop_requested = False
+        self.voice_client.play(
+            source,
+            after=lambda e: asyncio.run_coroutine_threadsafe(
+                self.after_play(e), self.bot.loop
+            )
+        )
+
+    def clear(self):
+        """Clear the queue and stop any playlist still loading into it"""
+        self.queue.clear()
+        self.generation += 1
+
+    async def resolve(self, song: Song) -> str:
+        """Resolve a song's stream URL, filling in metadata for lazy playlist entries"""
+        if song.resolved:
+            stream_url = self.stream_cache.get(song.url)
+            if stream_url:
+                return stream_url
+
+        task = self.resolving.get(song.url)
+        if task is None:
+            task = asyncio.create_task(self._resolve(song))
+            self.resolving[song.url] = task
+            task.add_done_callback(lambda _: self.resolving.pop(song.url, None))
+        return await asyncio.shield(task)
+
+    async def _resolve(self, song: Song) -> str:
+        with log_stage(logger, 'resolve', self.guild_id):
+            info = await asyncio.get_running_loop().run_in_executor(None, extract_stream_info, song.url)
+
+        song.update_from_info(info)
+        self.stream_cache.put(song.url, info['url'])
+        await self.bot.track_cache.update(
+            song.url, title=song.title, duration=song.duration, thumbnail=song.thumbnail
+        )
+        return info['url']
+
+    async def prefetch_next(self):
+        """Resolve the next queued song while the current one plays"""
+        if not self.queue:
+            return
+
+        song = self.queue[0]
+        try:
+            await self.resolve(song)
+        except Exception as e:
+            logger.debug("Prefetch failed for %s: %s", song.url, e, extra={'guild_id': self.guild_id})
+
+    async def record_history(self, url: str):
+        """Persist a play in the guild's history, never letting a database error affect playback"""
+        try:
+            await self.bot.track_cache.record_play(self.guild_id, url)
+        except Exception as e:
+            logger.error("Failed to record play of %s: %s", url, e, extra={'guild_id': self.guild_id})
+
     async def play_next(self):
         """Play the next song in queue"""
         if len(self.queue) > 0:
             self.current = self.queue.popleft()
 
             try:
-                source = await self.create_source(self.current.url)
-                self.voice_client.play(
-                    source,
-                    after=lambda e: asyncio.run_coroutine_threadsafe(
-                        self.after_play(e), self.bot.loop
-                    )
-                )
+                self.failover_attempts = 0
+                source = await self.create_source(self.current)
+                self.start_playback(source)
+                asyncio.create_task(self.prefetch_next())
+                self.warmer.record_play(self.current.url)
+                asyncio.create_task(self.record_history(self.current.url))
 
                 embed = discord.Embed(
                     title="🎵 Now Playing",
@@ -230,7 +404,7 @@ class MusicPlayer:
                     await self.text_channel.send(embed=embed)
 
             except Exception as e:
-                logger.error(f"Error playing song: {e}")
+                logger.error("Error playing song: %s", e)
                 if self.text_channel:
                     await self.text_channel.send(f"❌ Error playing song: {str(e)}")
                 await self.play_next()
@@ -240,39 +414,91 @@ class MusicPlayer:
     async def after_play(self, error):
         """Called after a song finishes playing"""
         if error:
-            logger.error(f"Player error: {error}")
+            logger.error("Player error: %s", error, extra={'guild_id': self.guild_id})
+
+        if self.current and not self.stop_requested and self.ended_early(error):
+            if await self.failover(self.current):
+                return
 
         if self.loop and self.current:
             self.queue.appendleft(self.current)
 
         await self.play_next()
 
-    async def create_source(self, url: str):
-        """Create audio source from URL"""
-        ytdl_opts = {
-            'format': 'bestaudio/best',
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': False,
-            'noplaylist': False,
-            'nocheckcertificate': True,
-            'ignoreerrors': False,
-            'logtostderr': False,
-            'no_color': True,
-            'source_address': '0.0.0.0',
-        }
+    def ended_early(self, error) -> bool:
+        """Check whether playback stopped before the end of the song (e.g. the stream URL expired)"""
+        if error:
+            return True
+        if not self.current.duration:
+            return False
+        return self.position < self.current.duration - Config.FAILOVER_END_TOLERANCE
+
+    async def failover(self, song: Song) -> bool:
+        """Re-resolve the song and resume playback where it stopped, returns False if giving up"""
+        if self.failover_attempts >= Config.FAILOVER_MAX_ATTEMPTS:
+            return False
+        if not self.voice_client or not self.voice_client.is_connected():
+            return False
+
+        self.failover_attempts += 1
+        offset = self.position
+        metrics.incr('playback.failover')
+        logger.warning(
+            "Stream for %r ended early at %.1fs of %ss, resuming (attempt %s)",
+            song.title, offset, song.duration, self.failover_attempts,
+            extra={'guild_id': self.guild_id, 'stage': 'failover'}
+        )
 
-        with yt_dlp.YoutubeDL(ytdl_opts) as ytdl:
-            info = ytdl.extract_info(url, download=False)
-            url2 = info['url']
+        # The old stream URL is most likely expired, so force a fresh extraction
+        self.stream_cache.invalidate(song.url)
+        try:
+            source = await self.create_source(song, offset)
+            if self.stop_requested or self.current is not song or not self.voice_client:
+                # Stopped or moved on while re-resolving, whoever did that already handled the queue
+                source.cleanup()
+                logger.info("Dropping failover for %r, playback changed meanwhile", song.title,
+                            extra={'guild_id': self.guild_id, 'stage': 'failover'})
+                return True
+            self.start_playback(source)
+        except Exception as e:
+            metrics.incr('playback.failover_failed')
+            logger.error("Failover failed for %r: %s", song.title, e, extra={'guild_id': self.guild_id})
+            return False
+        return True
+
+    async def create_source(self, song: Song, offset: float = 0.0):
+        """Create audio source for a song, optionally starting at an offset in seconds"""
+        audio_cache = self.warmer.audio_cache
+        local_path = audio_cache.path_for(song.url) if audio_cache else None
+
+        if local_path:
+            # Pre-downloaded audio needs neither a stream URL nor HTTP reconnect options
+            url2 = local_path
+            before_options = ''
+        else:
+            url2 = await self.resolve(song)
+            before_options = '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5'
+
+        if offset > 0:
+            # Input seeking, so FFmpeg skips straight to the offset instead of decoding up to it
+            before_options = f"-ss {offset:.2f} {before_options}"
+
+        options = '-vn'
+        if self.bot.guild_config.get(self.guild_id, 'normalize_volume'):
+            # Apply the cached loudness as a cheap static gain, measuring it in the background on first play
+            gain = self.loudness.gain_for(song.url)
+            if gain is None:
+                self.loudness.schedule(song.url, url2, song.duration)
+            elif abs(gain) >= 0.1:
+                options = f"{options} -af volume={gain:.1f}dB"
 
         ffmpeg_opts = {
-            'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
-            'options': '-vn'
+            'before_options': before_options,
+            'options': options
         }
 
         source = discord.FFmpegPCMAudio(url2, **ffmpeg_opts)
-        return discord.PCMVolumeTransformer(source, volume=self.volume)
+        return TrackedAudio(source, volume=self.volume, start_offset=offset)
 
 
 class MusicCog(commands.Cog):
@@ -282,7 +508,45 @@ class MusicCog(commands.Cog):
         self.bot = bot
         self.players = {}
         self.spotify = None
-        self.control_panel_message = None
+        self.control_panel_messages = {}  # guild_id -> control panel message
+        self.stream_cache = StreamCache()
+        self.loudness = LoudnessAnalyzer(
+            bot.track_cache,
+            target=Config.LOUDNESS_TARGET,
+            max_gain=Config.LOUDNESS_MAX_GAIN,
+            max_duration=Config.LOUDNESS_MAX_DURATION,
+            timeout=Config.LOUDNESS_TIMEOUT,
+            max_attempts=Config.LOUDNESS_MAX_ATTEMPTS,
+            retry_delay=Config.LOUDNESS_RETRY_DELAY
+        )
+
+        # Popular tracks are resolved in the background after startup, yielding to live /play requests
+        self.live_requests = 0
+        self.warmer = CacheWarmer(
+            resolve=self.prewarm_track,
+            is_busy=lambda: self.live_requests > 0,
+            interval=Config.PREWARM_INTERVAL,
+            audio_cache=(
+                AudioCache(Config.AUDIO_CACHE_DIR, Config.AUDIO_CACHE_MAX_DURATION)
+                if Config.PREWARM_DOWNLOAD_AUDIO else None
+            )
+        )
+
+        # Autocomplete suggestions come from every title we have resolved before
+        self.title_index = TitleIndex(bot.track_cache)
+        self.title_index.build()
+
+        # Full extraction is the primary search, a flat search is the cheaper hedge
+        search_sources = [('youtube', self.search_youtube)]
+        if Config.SEARCH_HEDGE_ENABLED:
+            search_sources.append(('youtube_flat', self.search_youtube_flat))
+        self.search = HedgedResolver(
+            search_sources,
+            accept=lambda song: song is not None and bool(song.url),
+            default_delay=Config.SEARCH_HEDGE_DEFAULT_DELAY,
+            min_delay=Config.SEARCH_HEDGE_MIN_DELAY,
+            max_delay=Config.SEARCH_HEDGE_MAX_DELAY
+        )
 
         # Initialize Spotify client if credentials are provided
         if Config.SPOTIFY_CLIENT_ID and Config.SPOTIFY_CLIENT_SECRET:
@@ -294,26 +558,71 @@ class MusicCog(commands.Cog):
                 self.spotify = spotipy.Spotify(auth_manager=auth_manager)
                 logger.info("Spotify client initialized")
             except Exception as e:
-                logger.warning(f"Failed to initialize Spotify: {e}")
+                logger.warning("Failed to initialize Spotify: %s", e)
 
     async def cog_load(self):
         """Called when cog is loaded"""
         # Add persistent view
         self.bot.add_view(MusicControlView(self))
+        self.bot.guild_config.add_listener(self.on_setting_changed)
+        self.bot.track_cache.add_listener(self.title_index.on_track_updated)
+
+    async def cog_unload(self):
+        """Called when cog is unloaded"""
+        self.warmer.stop()
+        self.bot.guild_config.remove_listener(self.on_setting_changed)
+        self.bot.track_cache.remove_listener(self.title_index.on_track_updated)
+
+    def on_setting_changed(self, guild_id: int, key: str, value):
+        """Move the control panel when a guild changes its music channel"""
+        if key != 'music_channel_id':
+            return
+
+        self.control_panel_messages.pop(guild_id, None)
+        guild = self.bot.get_guild(guild_id)
+        if guild and value:
+            asyncio.create_task(self.setup_control_panel(guild))
+
+    async def start_prewarm(self):
+        """Start pre-resolving the most popular tracks from play history"""
+        if not Config.PREWARM_ENABLED or self.warmer.running or self.warmer.total:
+            return
+
+        urls = self.bot.track_cache.popular(Config.PREWARM_TRACKS, Config.PREWARM_HALF_LIFE_DAYS * 86400)
+
+        # Only the current popular set stays on disk, so the audio cache can't grow without bound
+        if self.warmer.audio_cache:
+            await asyncio.get_running_loop().run_in_executor(None, self.warmer.audio_cache.scan, urls)
+
+        self.warmer.start(urls)
+
+    async def prewarm_track(self, url: str):
+        """Resolve a track's metadata and stream URL into the caches"""
+        if self.stream_cache.peek(url):
+            return
+
+        info = await asyncio.get_running_loop().run_in_executor(None, extract_stream_info, url)
+        self.stream_cache.put(url, info['url'])
+        await self.remember(Song.from_info(info, None))
 
-    async def setup_control_panel(self):
-        """Setup the music control panel in the dedicated channel"""
+    def get_music_channel(self, guild: discord.Guild) -> Optional[discord.TextChannel]:
+        """Get the guild's configured music channel, if it exists in that guild"""
+        channel_id = self.bot.guild_config.get(guild.id, 'music_channel_id')
+        return guild.get_channel(channel_id) if channel_id else None
+
+    async def setup_control_panel(self, guild: discord.Guild):
+        """Setup the music control panel in the guild's dedicated channel"""
         try:
-            channel = self.bot.get_channel(Config.MUSIC_CHANNEL_ID)
+            channel = self.get_music_channel(guild)
             if not channel:
-                logger.warning(f"Music channel {Config.MUSIC_CHANNEL_ID} not found")
+                logger.debug("No music channel configured for guild %s", guild.id, extra={'guild_id': guild.id})
                 return
 
             # Check for existing control panel
             async for message in channel.history(limit=50):
                 if message.author == self.bot.user and message.embeds:
                     if message.embeds[0].title == "🎵 Music Control Panel":
-                        self.control_panel_message = message
+                        self.control_panel_messages[guild.id] = message
                         return
 
             # Create new control panel
@@ -336,59 +645,226 @@ class MusicCog(commands.Cog):
             embed.set_footer(text="Music bot is ready!")
 
             view = MusicControlView(self)
-            self.control_panel_message = await channel.send(embed=embed, view=view)
-            logger.info("Music control panel created")
+            self.control_panel_messages[guild.id] = await channel.send(embed=embed, view=view)
+            logger.info("Music control panel created", extra={'guild_id': guild.id})
 
         except Exception as e:
-            logger.error(f"Failed to setup control panel: {e}")
+            logger.error("Failed to setup control panel: %s", e, extra={'guild_id': guild.id})
 
     def get_player(self, guild_id: int) -> MusicPlayer:
         """Get or create music player for guild"""
         if guild_id not in self.players:
-            self.players[guild_id] = MusicPlayer(guild_id, self.bot)
+            self.players[guild_id] = MusicPlayer(
+                guild_id, self.bot, self.stream_cache, self.loudness, self.warmer
+            )
         return self.players[guild_id]
 
+    async def search_youtube(self, query: str, requester: discord.Member) -> Optional[Song]:
+        """Search YouTube with full extraction, which also yields the stream URL"""
+        def search():
+            with yt_dlp.YoutubeDL({**YTDL_OPTIONS, 'noplaylist': True}) as ytdl:
+                return ytdl.extract_info(f"ytsearch1:{query}", download=False)
+
+        info = await asyncio.get_running_loop().run_in_executor(None, search)
+        entries = info.get('entries') or []
+        if not entries or not entries[0]:
+            return None
+
+        song = Song.from_info(entries[0], requester)
+        if entries[0].get('url'):
+            self.stream_cache.put(song.url, entries[0]['url'])
+        return song
+
+    async def search_youtube_flat(self, query: str, requester: discord.Member) -> Optional[Song]:
+        """Search YouTube with flat extraction, the stream URL is resolved at playback"""
+        def search():
+            with yt_dlp.YoutubeDL({**YTDL_OPTIONS, 'extract_flat': 'in_playlist'}) as ytdl:
+                return ytdl.extract_info(f"ytsearch1:{query}", download=False)
+
+        info = await asyncio.get_running_loop().run_in_executor(None, search)
+        entries = info.get('entries') or []
+        if not entries or not entries[0]:
+            return None
+        return Song.from_flat_entry(entries[0], requester)
+
+    async def remember(self, song: Song):
+        """Store a resolved song's metadata so it can be suggested and reused later"""
+        fields = {'title': song.title, 'duration': song.duration or None, 'thumbnail': song.thumbnail}
+        await self.bot.track_cache.update(
+            song.url, **{key: value for key, value in fields.items() if value is not None}
+        )
+
     async def extract_info(self, query: str, requester: discord.Member):
         """Extract song info from URL or search query"""
-        ytdl_opts = {
-            'format': 'bestaudio/best',
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': False,
-            'default_search': 'ytsearch',
-            'noplaylist': True,
-            'nocheckcertificate': True,
-            'ignoreerrors': False,
-            'logtostderr': False,
-            'no_color': True,
-            'source_address': '0.0.0.0',
-        }
+        ytdl_opts = {**YTDL_OPTIONS, 'noplaylist': True}
+        guild_id = requester.guild.id if isinstance(requester, discord.Member) else None
 
         try:
-            with yt_dlp.YoutubeDL(ytdl_opts) as ytdl:
-                if not query.startswith('http'):
-                    query = f"ytsearch:{query}"
+            if not query.startswith('http'):
+                with log_stage(logger, 'search', guild_id):
+                    source, song = await self.search.resolve(query, requester)
+                if song is None:
+                    raise ValueError(f"No results found for {query!r}")
+                logger.debug("Search for %r answered by %s", query, source, extra={'guild_id': guild_id})
+                await self.remember(song)
+                return song
 
-                info = await asyncio.get_event_loop().run_in_executor(
-                    None, lambda: ytdl.extract_info(query, download=False)
-                )
+            # Known videos (e.g. picked from autocomplete) skip extraction, the stream is resolved at playback
+            track = self.bot.track_cache.get(query)
+            if track and track.get('title'):
+                metrics.incr('extract.cache_hit')
+                return Song.from_cache(query, track, requester)
+
+            with yt_dlp.YoutubeDL(ytdl_opts) as ytdl:
+                with log_stage(logger, 'extract_info', guild_id):
+                    info = await asyncio.get_event_loop().run_in_executor(
+                        None, lambda: ytdl.extract_info(query, download=False)
+                    )
 
                 if 'entries' in info:
                     info = info['entries'][0]
 
-                song = Song(
-                    title=info.get('title', 'Unknown'),
-                    url=info.get('webpage_url', info.get('url')),
-                    duration=info.get('duration', 0),
-                    thumbnail=info.get('thumbnail'),
-                    requester=requester
-                )
+                song = Song.from_info(info, requester)
+                if info.get('url'):
+                    self.stream_cache.put(song.url, info['url'])
+                await self.remember(song)
                 return song
 
         except Exception as e:
-            logger.error(f"Error extracting info: {e}")
+            logger.error("Error extracting info: %s", e)
+            raise
+
+    @staticmethod
+    def is_youtube_playlist(url: str) -> bool:
+        """Check whether a URL points at a YouTube playlist or mix"""
+        parsed = urlparse(url)
+        if parsed.hostname not in YOUTUBE_HOSTS:
+            return False
+        return 'list' in parse_qs(parsed.query)
+
+    @staticmethod
+    def linked_video_id(url: str) -> Optional[str]:
+        """Get the video a playlist link points at (watch?v=X&list=... or youtu.be/X?list=...)"""
+        parsed = urlparse(url)
+        if parsed.hostname == 'youtu.be':
+            return parsed.path.strip('/') or None
+        return parse_qs(parsed.query).get('v', [None])[0]
+
+    @staticmethod
+    def take_entries(entries, count: int) -> list:
+        """Pull up to count entries from a lazy playlist iterator (blocking, pages in from YouTube)"""
+        batch = []
+        for entry in entries:
+            if entry:
+                batch.append(entry)
+            if len(batch) >= count:
+                break
+        return batch
+
+    async def enqueue_playlist(self, url: str, requester: discord.Member, player: MusicPlayer):
+        """Enqueue the first page of a YouTube playlist and keep loading the rest in the background
+
+        When the link points at a video inside the playlist, that video is queued first and skipped
+        when the playlist reaches it, so it plays right away like a plain video link.
+        """
+        loop = asyncio.get_running_loop()
+        start_id = self.linked_video_id(url)
+        ytdl = yt_dlp.YoutubeDL({**YTDL_OPTIONS, 'extract_flat': 'in_playlist', 'lazy_playlist': True})
+
+        def open_playlist():
+            playlist_id = parse_qs(urlparse(url).query)['list'][0]
+            info = ytdl.extract_info(
+                f"https://www.youtube.com/playlist?list={playlist_id}", download=False, process=False
+            )
+            # Follow redirects (e.g. mixes) until we reach the actual playlist
+            for _ in range(3):
+                if info.get('_type') not in ('url', 'url_transparent'):
+                    break
+                info = ytdl.extract_info(info['url'], download=False, process=False)
+            return info
+
+        async def open_first_page():
+            with log_stage(logger, 'playlist_first_page', player.guild_id):
+                info = await loop.run_in_executor(None, open_playlist)
+                entries = iter(info.get('entries') or [])
+                batch = await loop.run_in_executor(None, self.take_entries, entries, Config.PLAYLIST_PAGE_SIZE)
+            return info, entries, batch
+
+        try:
+            info, entries, batch = await open_first_page()
+        except Exception:
+            ytdl.close()
             raise
 
+        # The linked video is queued lazily like any playlist entry and only resolved at playback
+        start_song = self.linked_song(start_id, batch, requester) if start_id else None
+        songs = [start_song] if start_song else []
+        songs += self.playlist_songs(batch, requester, start_id)
+        if not songs:
+            ytdl.close()
+            raise ValueError("Playlist is empty or unavailable")
+
+        player.queue.extend(songs)
+        title = info.get('title') or 'playlist'
+        count = len(songs)
+
+        if len(batch) < Config.PLAYLIST_PAGE_SIZE:
+            ytdl.close()
+            return title, count, False, start_song
+
+        asyncio.create_task(
+            self.load_playlist_pages(ytdl, entries, len(batch), count, title, requester, player, start_id)
+        )
+        return title, count, True, start_song
+
+    def linked_song(self, video_id: str, batch: list, requester: discord.Member) -> Song:
+        """Create an unresolved song for a playlist link's video, using the flat entry or cached metadata"""
+        entry = next((entry for entry in batch if entry.get('id') == video_id), None)
+        if entry is None:
+            track = self.bot.track_cache.get(f"https://www.youtube.com/watch?v={video_id}") or {}
+            thumbnails = [{'url': track['thumbnail']}] if track.get('thumbnail') else []
+            entry = {'id': video_id, 'title': track.get('title'), 'duration': track.get('duration'),
+                     'thumbnails': thumbnails}
+        return Song.from_flat_entry(entry, requester)
+
+    @staticmethod
+    def playlist_songs(batch: list, requester: discord.Member, skip_id: Optional[str] = None) -> list:
+        """Turn flat playlist entries into songs, leaving out the already queued linked video"""
+        return [Song.from_flat_entry(entry, requester) for entry in batch if not skip_id or entry.get('id') != skip_id]
+
+    async def load_playlist_pages(self, ytdl, entries, loaded: int, queued: int, title: str,
+                                  requester: discord.Member, player: MusicPlayer, skip_id: Optional[str] = None):
+        """Keep paging a playlist into the queue until it ends, hits the limit or the queue is cleared
+
+        loaded counts the playlist entries read so far, queued the songs actually added to the queue.
+        """
+        loop = asyncio.get_running_loop()
+        generation = player.generation
+
+        try:
+            while loaded < Config.PLAYLIST_MAX_ITEMS:
+                count = min(Config.PLAYLIST_PAGE_SIZE, Config.PLAYLIST_MAX_ITEMS - loaded)
+                batch = await loop.run_in_executor(None, self.take_entries, entries, count)
+                if player.generation != generation:
+                    return
+                if not batch:
+                    break
+
+                songs = self.playlist_songs(batch, requester, skip_id)
+                player.queue.extend(songs)
+                loaded += len(batch)
+                queued += len(songs)
+
+            logger.info("Loaded %s songs from playlist %r", queued, title, extra={'guild_id': player.guild_id})
+            if player.text_channel:
+                await player.text_channel.send(f"📜 Finished loading **{queued}** songs from **{title}**")
+
+        except Exception as e:
+            logger.warning("Failed to load the rest of playlist %r: %s", title, e,
+                           extra={'guild_id': player.guild_id, 'stage': 'playlist_page'})
+        finally:
+            await loop.run_in_executor(None, ytdl.close)
+
     async def process_spotify_url(self, url: str, requester: discord.Member):
         """Process Spotify URL and return list of songs"""
         if not self.spotify:
@@ -421,7 +897,9 @@ class MusicCog(commands.Cog):
                         try:
                             song = await self.extract_info(query, requester)
                             songs.append(song)
-                        except:
+                        except Exception as e:
+                            logger.warning("Failed to resolve playlist item %r: %s", query, e,
+                                           extra={'guild_id': requester.guild.id, 'stage': 'spotify_playlist'})
                             continue
 
             elif content_type == 'album':
@@ -431,11 +909,13 @@ class MusicCog(commands.Cog):
                     try:
                         song = await self.extract_info(query, requester)
                         songs.append(song)
-                    except:
+                    except Exception as e:
+                        logger.warning("Failed to resolve album item %r: %s", query, e,
+                                       extra={'guild_id': requester.guild.id, 'stage': 'spotify_album'})
                         continue
 
         except Exception as e:
-            logger.error(f"Spotify error: {e}")
+            logger.error("Spotify error: %s", e)
             raise
 
         return songs
@@ -445,8 +925,8 @@ class MusicCog(commands.Cog):
     async def play(self, interaction: discord.Interaction, query: str):
         """Play a song from YouTube or Spotify"""
         # Check if music channel is configured and enforce it
-        if Config.MUSIC_CHANNEL_ID and interaction.channel.id != Config.MUSIC_CHANNEL_ID:
-            music_channel = self.bot.get_channel(Config.MUSIC_CHANNEL_ID)
+        music_channel = self.get_music_channel(interaction.guild)
+        if music_channel and interaction.channel.id != music_channel.id:
             await interaction.response.send_message(
                 f"❌ Please use music commands in {music_channel.mention}!",
                 ephemeral=True
@@ -463,13 +943,12 @@ class MusicCog(commands.Cog):
         player.text_channel = interaction.channel
 
         # Set control thread reference if available
-        music_cog = interaction.client.get_cog('MusicCog')
-        if music_cog and hasattr(music_cog, 'control_panel_message'):
-            player.control_thread = music_cog.control_panel_message
+        player.control_thread = self.control_panel_messages.get(interaction.guild.id)
 
         if not player.voice_client:
             player.voice_client = await interaction.user.voice.channel.connect()
 
+        self.live_requests += 1
         try:
             if 'spotify.com' in query:
                 songs = await self.process_spotify_url(query, interaction.user)
@@ -483,6 +962,21 @@ class MusicCog(commands.Cog):
                     ephemeral=True
                 )
 
+            elif self.is_youtube_playlist(query):
+                title, count, loading, start_song = await self.enqueue_playlist(query, interaction.user, player)
+
+                # Ephemeral response
+                first = ""
+                if start_song:
+                    # Lazy songs only have a title if the playlist page or track cache knew it
+                    known = start_song.title != 'Unknown'
+                    first = f", starting with **{start_song.title}**" if known else ", starting with the linked video"
+                more = ", loading the rest in the background" if loading else ""
+                await interaction.followup.send(
+                    f"✅ Added **{count}** songs from **{title}** to queue{first}{more}",
+                    ephemeral=True
+                )
+
             else:
                 song = await self.extract_info(query, interaction.user)
                 player.queue.append(song)
@@ -498,6 +992,22 @@ class MusicCog(commands.Cog):
 
         except Exception as e:
             await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
+        finally:
+            self.live_requests -= 1
+
+    @play.autocomplete('query')
+    async def play_autocomplete(self, interaction: discord.Interaction,
+                                current: str) -> List[app_commands.Choice[str]]:
+        """Suggest previously played songs, served from the in-memory title index"""
+        if current.startswith('http'):
+            return []
+
+        results = self.title_index.search(current, interaction.guild_id)
+        return [
+            app_commands.Choice(name=title[:100], value=url)
+            for url, title in results
+            if len(url) <= 100
+        ]
 
     @app_commands.command(name='volume', description='Set volume (0-100)')
     @app_commands.describe(volume='Volume level from 0 to 100')
@@ -526,7 +1036,7 @@ class MusicCog(commands.Cog):
             return
 
         queue_size = len(player.queue)
-        player.queue.clear()
+        player.clear()
         await interaction.response.send_message(f"🗑️ Cleared {queue_size} song(s) from the queue!", ephemeral=True)
 
 
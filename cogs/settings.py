@@ -0,0 +1,83 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+import logging
+from typing import Optional
+
+logger = logging.getLogger("discord_bot")
+
+
+class SettingsCog(commands.Cog):
+    """Admin commands for per-guild configuration"""
+
+    config = app_commands.Group(
+        name='config',
+        description='Configure the bot for this server',
+        guild_only=True,
+        default_permissions=discord.Permissions(manage_guild=True)
+    )
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def update_setting(self, interaction: discord.Interaction, key: str, channel, label: str):
+        """Store a channel setting and report the result"""
+        value = channel.id if channel else None
+        await self.bot.guild_config.set(interaction.guild.id, key, value)
+        logger.info("Guild %s set %s to %s", interaction.guild.id, key, value,
+                    extra={'guild_id': interaction.guild.id})
+
+        if channel:
+            await interaction.response.send_message(f"✅ {label} set to {channel.mention}", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"✅ {label} reset to default", ephemeral=True)
+
+    @config.command(name='music_channel', description='Set the channel where music commands are allowed')
+    @app_commands.describe(channel='Text channel for music commands (leave empty to reset)')
+    async def music_channel(self, interaction: discord.Interaction, channel: Optional[discord.TextChannel] = None):
+        await self.update_setting(interaction, 'music_channel_id', channel, "Music channel")
+
+    @config.command(name='voice_join', description='Set the "Join to Create" voice channel')
+    @app_commands.describe(channel='Voice channel that creates temporary channels (leave empty to reset)')
+    async def voice_join(self, interaction: discord.Interaction, channel: Optional[discord.VoiceChannel] = None):
+        await self.update_setting(interaction, 'voice_join_channel_id', channel, "Join to Create channel")
+
+    @config.command(name='voice_category', description='Set the category where temporary voice channels are created')
+    @app_commands.describe(category='Category for temporary voice channels (leave empty to reset)')
+    async def voice_category(self, interaction: discord.Interaction,
+                             category: Optional[discord.CategoryChannel] = None):
+        await self.update_setting(interaction, 'voice_category_id', category, "Voice category")
+
+    @config.command(name='log_channel', description='Set the channel for this server\'s log messages')
+    @app_commands.describe(channel='Text channel for log messages (leave empty to reset)')
+    async def log_channel(self, interaction: discord.Interaction, channel: Optional[discord.TextChannel] = None):
+        await self.update_setting(interaction, 'log_channel_id', channel, "Log channel")
+
+    @config.command(name='normalize', description='Toggle loudness normalization for music playback')
+    @app_commands.describe(enabled='Play every track at a similar loudness')
+    async def normalize(self, interaction: discord.Interaction, enabled: bool):
+        await self.bot.guild_config.set(interaction.guild.id, 'normalize_volume', enabled)
+        logger.info("Guild %s set normalize_volume to %s", interaction.guild.id, enabled,
+                    extra={'guild_id': interaction.guild.id})
+
+        status = "enabled ✅" if enabled else "disabled ❌"
+        await interaction.response.send_message(f"🔊 Loudness normalization {status}", ephemeral=True)
+
+    @config.command(name='show', description='Show the current settings for this server')
+    async def show(self, interaction: discord.Interaction):
+        embed = discord.Embed(title="⚙️ Server Settings", color=discord.Color.blue())
+
+        for key, value in self.bot.guild_config.get_all(interaction.guild.id).items():
+            if key.endswith('_id'):
+                channel = interaction.guild.get_channel(value) if value else None
+                display = channel.mention if channel else "Not set"
+            else:
+                display = "✅ Enabled" if value else "❌ Disabled"
+            embed.add_field(name=key, value=display, inline=False)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot):
+    """Setup function for the cog"""
+    await bot.add_cog(SettingsCog(bot))
@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 import logging
-from utils.config import Config
 
 logger = logging.getLogger("discord_bot")
 
@@ -28,13 +27,16 @@ class VoiceCog(commands.Cog):
     async def handle_join(self, member: discord.Member, channel: discord.VoiceChannel):
         """Handle user joining a voice channel"""
 
+        settings = self.bot.guild_config
+
         # Check if they joined the "Join to Create" channel
-        if channel.id == Config.VOICE_JOIN_CHANNEL_ID:
+        if channel.id == settings.get(member.guild.id, 'voice_join_channel_id'):
             try:
                 # Get the category
-                category = self.bot.get_channel(Config.VOICE_CATEGORY_ID)
+                category_id = settings.get(member.guild.id, 'voice_category_id')
+                category = member.guild.get_channel(category_id)
                 if not category:
-                    logger.error(f"Category {Config.VOICE_CATEGORY_ID} not found")
+                    logger.error("Category %s not found", category_id, extra={'guild_id': member.guild.id})
                     return
 
                 # Create a new voice channel
@@ -63,14 +65,14 @@ class VoiceCog(commands.Cog):
                     'creator': member.id
                 }
 
-                logger.info(f"Created temporary voice channel '{new_channel.name}' for {member.name}")
+                logger.info("Created temporary voice channel '%s' for %s", new_channel.name, member.name)
 
             except discord.Forbidden:
                 logger.error("Bot lacks permissions to create voice channels")
             except discord.HTTPException as e:
-                logger.error(f"Failed to create voice channel: {e}")
+                logger.error("Failed to create voice channel: %s", e)
             except Exception as e:
-                logger.error(f"Unexpected error creating voice channel: {e}")
+                logger.error("Unexpected error creating voice channel: %s", e)
 
     async def handle_leave(self, channel: discord.VoiceChannel):
         """Handle user leaving a voice channel"""
@@ -83,14 +85,14 @@ class VoiceCog(commands.Cog):
                     channel_name = channel.name
                     await channel.delete(reason="Temporary voice channel is empty")
                     del self.temp_channels[channel.id]
-                    logger.info(f"Deleted empty temporary voice channel '{channel_name}'")
+                    logger.info("Deleted empty temporary voice channel '%s'", channel_name)
 
                 except discord.Forbidden:
-                    logger.error(f"Bot lacks permissions to delete channel {channel.name}")
+                    logger.error("Bot lacks permissions to delete channel %s", channel.name)
                 except discord.HTTPException as e:
-                    logger.error(f"Failed to delete channel: {e}")
+                    logger.error("Failed to delete channel: %s", e)
                 except Exception as e:
-                    logger.error(f"Unexpected error deleting channel: {e}")
+                    logger.error("Unexpected error deleting channel: %s", e)
 
 
 async def setup(bot):
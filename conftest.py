@@ -0,0 +1 @@
+# Lets pytest import the bot's packages (utils, cogs) from the repository root
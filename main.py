@@ -3,10 +3,20 @@ from discord.ext import commands
 import asyncio
 import logging
 from utils.config import Config
-from utils.logger import setup_logger, add_discord_handler
+from utils.logger import setup_logger, add_discord_handler, stop_logging
+from utils.database import Database
+from utils.guild_config import GuildConfigStore
+from utils.track_cache import TrackCache
+from utils.watchdog import LoopWatchdog
 
 # Setup logger
-logger = setup_logger()
+logger = setup_logger(
+    log_dir=Config.LOG_DIR,
+    max_bytes=Config.LOG_FILE_MAX_BYTES,
+    backup_count=Config.LOG_FILE_BACKUP_COUNT,
+    debug_sample_rate=Config.LOG_DEBUG_SAMPLE_RATE,
+    rate_limit_interval=Config.LOG_RATE_LIMIT_SECONDS
+)
 
 
 class DiscordBot(commands.Bot):
@@ -25,48 +35,69 @@ class DiscordBot(commands.Bot):
             help_command=None  # Disable default help for slash commands
         )
 
+        self.watchdog = LoopWatchdog(threshold=Config.LOOP_LAG_THRESHOLD)
+        self.database = Database(Config.DATABASE_PATH)
+        self.guild_config = GuildConfigStore(self.database)
+        self.track_cache = TrackCache(self.database)
+
     async def setup_hook(self):
         """Setup hook called when bot is starting"""
         logger.info("Setting up bot...")
 
+        # Start event loop lag monitoring
+        if Config.LOOP_WATCHDOG_ENABLED:
+            self.watchdog.start()
+
+        # Load per-guild settings and track metadata before any cog needs them
+        await self.guild_config.load()
+        await self.track_cache.load()
+
         # Load cogs
-        cogs_to_load = ['cogs.voice', 'cogs.music']
+        cogs_to_load = ['cogs.settings', 'cogs.voice', 'cogs.music', 'cogs.debug']
 
         for cog in cogs_to_load:
             try:
                 await self.load_extension(cog)
-                logger.info(f"Loaded {cog}")
+                logger.info("Loaded %s", cog)
             except Exception as e:
-                logger.error(f"Failed to load {cog}: {e}")
+                logger.error("Failed to load %s: %s", cog, e)
 
         # Sync slash commands
         try:
             logger.info("Syncing slash commands...")
             synced = await self.tree.sync()
-            logger.info(f"Synced {len(synced)} slash command(s)")
+            logger.info("Synced %s slash command(s)", len(synced))
         except Exception as e:
-            logger.error(f"Failed to sync commands: {e}")
+            logger.error("Failed to sync commands: %s", e)
 
     async def on_ready(self):
         """Called when bot is ready"""
-        logger.info(f'Bot is ready! Logged in as {self.user.name} (ID: {self.user.id})')
-        logger.info(f'Connected to {len(self.guilds)} guild(s)')
+        logger.info('Bot is ready! Logged in as %s (ID: %s)', self.user.name, self.user.id)
+        logger.info('Connected to %s guild(s)', len(self.guilds))
 
         # Setup Discord log handler
         try:
             await add_discord_handler(logger, self, Config.LOG_CHANNEL_ID)
             logger.info("Discord log handler initialized")
         except Exception as e:
-            logger.error(f"Failed to setup Discord log handler: {e}")
-
-        # Setup music control panel
-        try:
-            music_cog = self.get_cog('MusicCog')
-            if music_cog and Config.MUSIC_CHANNEL_ID:
-                await music_cog.setup_control_panel()
-                logger.info("Music control panel setup complete")
-        except Exception as e:
-            logger.error(f"Failed to setup music control panel: {e}")
+            logger.error("Failed to setup Discord log handler: %s", e)
+
+        # Setup music control panels
+        music_cog = self.get_cog('MusicCog')
+        if music_cog:
+            for guild in self.guilds:
+                try:
+                    await music_cog.setup_control_panel(guild)
+                except Exception as e:
+                    logger.error("Failed to setup music control panel: %s", e, extra={'guild_id': guild.id})
+            logger.info("Music control panel setup complete")
+
+        # Warm caches from play history once the bot is connected
+        if music_cog:
+            try:
+                await music_cog.start_prewarm()
+            except Exception as e:
+                logger.error("Failed to start cache pre-warming: %s", e)
 
         # Set bot status
         await self.change_presence(
@@ -76,6 +107,12 @@ class DiscordBot(commands.Bot):
             )
         )
 
+    async def close(self):
+        """Stop background monitors and close the database when shutting down"""
+        self.watchdog.stop()
+        await super().close()
+        self.database.close()
+
     async def on_command_error(self, ctx, error):
         """Global error handler for commands"""
         if isinstance(error, commands.CommandNotFound):
@@ -85,7 +122,7 @@ class DiscordBot(commands.Bot):
         elif isinstance(error, commands.MissingRequiredArgument):
             await ctx.send(f"❌ Missing required argument: {error.param.name}")
         else:
-            logger.error(f"Command error in {ctx.command}: {error}")
+            logger.error("Command error in %s: %s", ctx.command, error)
             await ctx.send("❌ An error occurred while executing the command.")
 
 
@@ -96,7 +133,7 @@ async def main():
     try:
         Config.validate()
     except ValueError as e:
-        logger.error(f"Configuration error: {e}")
+        logger.error("Configuration error: %s", e)
         return
 
     # Create and run bot
@@ -108,11 +145,13 @@ async def main():
     except discord.LoginFailure:
         logger.error("Invalid bot token provided")
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
 
 
 if __name__ == "__main__":
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        logger.info("Bot shutdown requested")
\ No newline at end of file
+        logger.info("Bot shutdown requested")
+    finally:
+        stop_logging()
\ No newline at end of file
@@ -0,0 +1,98 @@
+import asyncio
+from utils.hedge import HedgedResolver
+
+
+def make_source(result=None, delay: float = 0.0, error: Exception = None, calls: list = None):
+    """Fake extractor that answers after a delay, recording whether it finished or was cancelled"""
+    async def source(query):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if calls is not None:
+                calls.append('cancelled')
+            raise
+        if calls is not None:
+            calls.append('finished')
+        if error:
+            raise error
+        return result
+    return source
+
+
+async def timed_resolve(resolver: HedgedResolver):
+    """Resolve a query, returning (result, seconds taken)"""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    result = await resolver.resolve('query')
+    return result, loop.time() - start
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    primary_calls = []
+    resolver = HedgedResolver(
+        [('primary', make_source('slow', delay=1.0, calls=primary_calls)),
+         ('backup', make_source('fast', delay=0.01))],
+        default_delay=0.05
+    )
+
+    async def run():
+        result = await resolver.resolve('query')
+        await asyncio.sleep(0)  # let the cancellation reach the primary
+        return result
+
+    assert asyncio.run(run()) == ('backup', 'fast')
+    assert primary_calls == ['cancelled']
+
+
+def test_failing_primary_falls_through_without_waiting():
+    resolver = HedgedResolver(
+        [('primary', make_source(error=ValueError('boom'))), ('backup', make_source('found'))],
+        default_delay=5.0
+    )
+
+    result, elapsed = asyncio.run(timed_resolve(resolver))
+    assert result == ('backup', 'found')
+    assert elapsed < 1.0
+
+
+def test_unacceptable_primary_falls_through_without_waiting():
+    resolver = HedgedResolver(
+        [('primary', make_source(None)), ('backup', make_source('found'))],
+        default_delay=5.0
+    )
+
+    result, elapsed = asyncio.run(timed_resolve(resolver))
+    assert result == ('backup', 'found')
+    assert elapsed < 1.0
+
+
+def test_every_source_failing_returns_none():
+    resolver = HedgedResolver(
+        [('primary', make_source(error=ValueError('boom'))), ('backup', make_source(None))],
+        default_delay=0.05
+    )
+
+    assert asyncio.run(resolver.resolve('query')) == (None, None)
+
+
+def test_hedge_delay_uses_clamped_percentile_after_min_samples():
+    resolver = HedgedResolver(
+        [('primary', make_source('x'))],
+        default_delay=1.5, min_delay=0.25, max_delay=5.0, min_samples=5
+    )
+    stats = resolver.stats['primary']
+
+    for _ in range(4):
+        stats.record(2.0)
+    assert resolver.hedge_delay('primary') == 1.5
+
+    stats.record(2.0)
+    assert resolver.hedge_delay('primary') == 2.0
+
+    for _ in range(100):
+        stats.record(0.01)
+    assert resolver.hedge_delay('primary') == 0.25
+
+    for _ in range(100):
+        stats.record(30.0)
+    assert resolver.hedge_delay('primary') == 5.0
@@ -0,0 +1,56 @@
+from utils.title_index import TitleIndex
+from utils.database import Database
+from utils.track_cache import TrackCache
+
+
+def make_index(titles: dict, history: dict) -> TitleIndex:
+    track_cache = TrackCache(Database(':memory:'))
+    for url, title in titles.items():
+        track_cache.tracks[url] = {'title': title}
+    track_cache.history = history
+
+    index = TitleIndex(track_cache)
+    index.build()
+    return index
+
+
+def test_search_ranks_played_tracks_above_unplayed():
+    index = make_index(
+        {'played': 'Never Gonna Give You Up', 'unplayed': 'Never Enough'},
+        {1: {'played': [3, 1000.0]}}
+    )
+
+    assert index.search('never', guild_id=1) == [
+        ('played', 'Never Gonna Give You Up'),
+        ('unplayed', 'Never Enough'),
+    ]
+
+
+def test_fuzzy_fallback_with_mixed_history():
+    index = make_index(
+        {'a': 'Bohemian Rhapsody', 'b': 'Bohemian Like You'},
+        {1: {'b': [1, 500.0]}}
+    )
+
+    assert [url for url, _ in index.search('bohemain', guild_id=1)] == ['b', 'a']
+
+
+def test_empty_query_returns_recent_history():
+    index = make_index(
+        {'old': 'Old Song', 'new': 'New Song'},
+        {1: {'old': [5, 100.0], 'new': [1, 200.0]}}
+    )
+
+    assert index.search('', guild_id=1) == [('new', 'New Song'), ('old', 'Old Song')]
+
+
+def test_removed_titles_leave_no_fuzzy_candidates():
+    index = make_index({'a': 'Bohemian Rhapsody', 'b': 'Bohemian Like You'}, {})
+
+    index.remove('a')
+    assert 'rhapsody' not in index.vocabulary.get('r', set())
+    assert 'bohemian' in index.vocabulary['b']
+
+    index.add('b', 'Something Else')
+    assert 'b' not in index.vocabulary
+    assert index.search('bohemian') == []
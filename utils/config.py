@@ -10,15 +10,19 @@ class Config:
     # Bot Token
     TOKEN = os.getenv('DISCORD_TOKEN')
 
-    # Logging Channel
-    LOG_CHANNEL_ID = 1423884966588186714
+    # Logging Channel (bot-wide)
+    LOG_CHANNEL_ID = int(os.getenv('LOG_CHANNEL_ID', '1423884966588186714'))
 
+    # Default channels used by guilds that have not configured their own (see /config)
     # Voice Channel Configuration
-    VOICE_CATEGORY_ID = 1423888180712833125
-    VOICE_JOIN_CHANNEL_ID = 1423888213105180712
+    VOICE_CATEGORY_ID = int(os.getenv('VOICE_CATEGORY_ID', '1423888180712833125'))
+    VOICE_JOIN_CHANNEL_ID = int(os.getenv('VOICE_JOIN_CHANNEL_ID', '1423888213105180712'))
 
     # Music Bot Channel
-    MUSIC_CHANNEL_ID = 1423898796202659941
+    MUSIC_CHANNEL_ID = int(os.getenv('MUSIC_CHANNEL_ID', '1423898796202659941'))
+
+    # Database for per-guild settings
+    DATABASE_PATH = os.getenv('DATABASE_PATH', 'data/bot.db')
 
     # Spotify Configuration (Optional)
     SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
@@ -27,6 +31,49 @@ class Config:
     # Bot Settings
     COMMAND_PREFIX = '!'
 
+    # YouTube playlists are paged into the queue in the background
+    PLAYLIST_PAGE_SIZE = int(os.getenv('PLAYLIST_PAGE_SIZE', '50'))
+    PLAYLIST_MAX_ITEMS = int(os.getenv('PLAYLIST_MAX_ITEMS', '5000'))
+
+    # Resume a song from where it stopped when its stream dies early
+    FAILOVER_MAX_ATTEMPTS = int(os.getenv('FAILOVER_MAX_ATTEMPTS', '3'))
+    FAILOVER_END_TOLERANCE = float(os.getenv('FAILOVER_END_TOLERANCE', '5'))  # seconds
+
+    # Loudness normalization (per guild, see /config normalize)
+    NORMALIZE_VOLUME = os.getenv('NORMALIZE_VOLUME', '0') == '1'
+    LOUDNESS_TARGET = float(os.getenv('LOUDNESS_TARGET', '-16'))  # LUFS
+    LOUDNESS_MAX_GAIN = float(os.getenv('LOUDNESS_MAX_GAIN', '10'))  # dB, either direction
+    LOUDNESS_MAX_DURATION = int(os.getenv('LOUDNESS_MAX_DURATION', '1200'))  # don't analyze longer tracks
+    LOUDNESS_TIMEOUT = float(os.getenv('LOUDNESS_TIMEOUT', '300'))  # seconds per analysis pass
+    LOUDNESS_MAX_ATTEMPTS = int(os.getenv('LOUDNESS_MAX_ATTEMPTS', '3'))  # failed passes before giving up on a track
+    LOUDNESS_RETRY_DELAY = float(os.getenv('LOUDNESS_RETRY_DELAY', '3600'))  # seconds, doubles after each failure
+
+    # Hedged search: start a backup search strategy when the primary is slower than usual
+    SEARCH_HEDGE_ENABLED = os.getenv('SEARCH_HEDGE_ENABLED', '1') == '1'
+    SEARCH_HEDGE_DEFAULT_DELAY = float(os.getenv('SEARCH_HEDGE_DEFAULT_DELAY', '1.5'))  # seconds
+    SEARCH_HEDGE_MIN_DELAY = float(os.getenv('SEARCH_HEDGE_MIN_DELAY', '0.25'))
+    SEARCH_HEDGE_MAX_DELAY = float(os.getenv('SEARCH_HEDGE_MAX_DELAY', '5'))
+
+    # Pre-resolve the most played tracks after startup
+    PREWARM_ENABLED = os.getenv('PREWARM_ENABLED', '1') == '1'
+    PREWARM_TRACKS = int(os.getenv('PREWARM_TRACKS', '50'))
+    PREWARM_INTERVAL = float(os.getenv('PREWARM_INTERVAL', '2'))  # seconds between tracks
+    PREWARM_HALF_LIFE_DAYS = float(os.getenv('PREWARM_HALF_LIFE_DAYS', '14'))
+    PREWARM_DOWNLOAD_AUDIO = os.getenv('PREWARM_DOWNLOAD_AUDIO', '0') == '1'
+    AUDIO_CACHE_DIR = os.getenv('AUDIO_CACHE_DIR', 'data/audio')
+    AUDIO_CACHE_MAX_DURATION = int(os.getenv('AUDIO_CACHE_MAX_DURATION', '1200'))  # don't download longer tracks
+
+    # Logging
+    LOG_DIR = os.getenv('LOG_DIR', 'logs')
+    LOG_FILE_MAX_BYTES = int(os.getenv('LOG_FILE_MAX_BYTES', str(10 * 1024 * 1024)))
+    LOG_FILE_BACKUP_COUNT = int(os.getenv('LOG_FILE_BACKUP_COUNT', '5'))
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '0.1'))  # fraction of DEBUG records kept
+    LOG_RATE_LIMIT_SECONDS = float(os.getenv('LOG_RATE_LIMIT_SECONDS', '10'))  # per call site, WARNING and above
+
+    # Event Loop Watchdog
+    LOOP_WATCHDOG_ENABLED = os.getenv('LOOP_WATCHDOG_ENABLED', '1') == '1'
+    LOOP_LAG_THRESHOLD = float(os.getenv('LOOP_LAG_THRESHOLD', '0.25'))  # seconds
+
     @classmethod
     def validate(cls):
         """Validate that all required config values are set"""
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger("discord_bot")
+
+
+class Database:
+    """One SQLite connection shared by every store, used from executor threads under a lock"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def run(self, func: Callable, *args):
+        """Call func(conn, *args) while holding the connection, opening it on first use (blocking)"""
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._open()
+            return func(self._conn, *args)
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class SQLiteStore:
+    """Base for in-memory caches persisted through a shared Database, with change listeners"""
+
+    # CREATE TABLE statements run before the store first reads
+    SCHEMA = ()
+
+    def __init__(self, database: Database):
+        self.database = database
+        self.listeners = []
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        for statement in self.SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+
+    async def _run(self, func: Callable, *args):
+        """Run func(conn, *args) on the shared connection in an executor thread"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.database.run, func, *args)
+
+    def notify(self, *args):
+        """Call every listener with args, logging instead of raising when one fails"""
+        for listener in self.listeners:
+            try:
+                listener(*args)
+            except Exception as e:
+                logger.error("%s listener failed: %s", type(self).__name__, e)
+
+    def add_listener(self, listener: Callable):
+        """Register a change callback"""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable):
+        """Unregister a change callback"""
+        if listener in self.listeners:
+            self.listeners.remove(listener)
@@ -0,0 +1,85 @@
+import logging
+from typing import Callable
+from utils.config import Config
+from utils.database import Database, SQLiteStore
+
+logger = logging.getLogger("discord_bot")
+
+
+class GuildConfigStore(SQLiteStore):
+    """Per-guild settings persisted in SQLite and served from an in-memory cache"""
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS guild_settings ("
+        "guild_id INTEGER NOT NULL, key TEXT NOT NULL, value, "
+        "PRIMARY KEY (guild_id, key))",
+    )
+
+    # Known settings and the global fallback used when a guild has not set them
+    DEFAULTS = {
+        'log_channel_id': Config.LOG_CHANNEL_ID,
+        'voice_category_id': Config.VOICE_CATEGORY_ID,
+        'voice_join_channel_id': Config.VOICE_JOIN_CHANNEL_ID,
+        'music_channel_id': Config.MUSIC_CHANNEL_ID,
+        'normalize_volume': Config.NORMALIZE_VOLUME,
+    }
+
+    def __init__(self, database: Database):
+        super().__init__(database)
+        self.cache = {}  # guild_id -> {key: value}
+
+    def _read_all(self, conn):
+        self._create_schema(conn)
+        return conn.execute("SELECT guild_id, key, value FROM guild_settings").fetchall()
+
+    @staticmethod
+    def _write(conn, guild_id: int, key: str, value):
+        if value is None:
+            conn.execute("DELETE FROM guild_settings WHERE guild_id = ? AND key = ?", (guild_id, key))
+        else:
+            conn.execute(
+                "INSERT OR REPLACE INTO guild_settings (guild_id, key, value) VALUES (?, ?, ?)",
+                (guild_id, key, value)
+            )
+        conn.commit()
+
+    async def load(self):
+        """Open the database and fill the cache with every stored setting"""
+        rows = await self._run(self._read_all)
+
+        self.cache.clear()
+        for guild_id, key, value in rows:
+            self.cache.setdefault(guild_id, {})[key] = value
+        logger.info("Loaded settings for %s guild(s)", len(self.cache))
+
+    def get(self, guild_id: int, key: str):
+        """Get a setting for a guild from the cache, falling back to the global default"""
+        if key not in self.DEFAULTS:
+            raise KeyError(f"Unknown setting: {key}")
+        return self.cache.get(guild_id, {}).get(key, self.DEFAULTS[key])
+
+    def get_all(self, guild_id: int) -> dict:
+        """Get every setting for a guild, including defaults"""
+        return {key: self.get(guild_id, key) for key in self.DEFAULTS}
+
+    async def set(self, guild_id: int, key: str, value):
+        """Persist a setting (None resets it to the default) and notify listeners"""
+        if key not in self.DEFAULTS:
+            raise KeyError(f"Unknown setting: {key}")
+
+        await self._run(self._write, guild_id, key, value)
+        self.invalidate(guild_id, key, value)
+
+    def invalidate(self, guild_id: int, key: str, value):
+        """Replace the cached value and tell listeners the setting changed"""
+        settings = self.cache.setdefault(guild_id, {})
+        if value is None:
+            settings.pop(key, None)
+        else:
+            settings[key] = value
+
+        self.notify(guild_id, key, self.get(guild_id, key))
+
+    def add_listener(self, listener: Callable[[int, str, object], None]):
+        """Register a callback invoked as listener(guild_id, key, value) on every change"""
+        super().add_listener(listener)
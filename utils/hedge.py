@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from utils.metrics import metrics
+
+logger = logging.getLogger("discord_bot")
+
+Source = Callable[..., Awaitable[Any]]
+
+
+class LatencyStats:
+    """Rolling window of latency samples for one source"""
+
+    def __init__(self, window: int = 100):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        """Add a latency sample"""
+        self.samples.append(seconds)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Get a percentile of the recent samples, or None if there are none"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+
+class HedgedResolver:
+    """Queries sources in order, starting the next one whenever the previous is slower than usual"""
+
+    def __init__(self, sources: List[Tuple[str, Source]], accept: Optional[Callable[[Any], bool]] = None,
+                 default_delay: float = 1.5, min_delay: float = 0.25, max_delay: float = 5.0,
+                 percentile: float = 90, min_samples: int = 5):
+        if not sources:
+            raise ValueError("HedgedResolver needs at least one source")
+
+        self.sources = sources
+        self.accept = accept or (lambda result: result is not None)
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.stats = {name: LatencyStats() for name, _ in sources}
+
+    def hedge_delay(self, name: str) -> float:
+        """How long to wait for a source before hedging, based on its usual latency"""
+        stats = self.stats[name]
+        if len(stats.samples) < self.min_samples:
+            return self.default_delay
+        return max(self.min_delay, min(self.max_delay, stats.percentile(self.percentile)))
+
+    async def _timed(self, name: str, source: Source, *args):
+        start = time.perf_counter()
+        try:
+            result = await source(*args)
+        except asyncio.CancelledError:
+            # A cancelled loser still took at least this long, which keeps the statistics honest
+            self.stats[name].record(time.perf_counter() - start)
+            raise
+        self.stats[name].record(time.perf_counter() - start)
+        return result
+
+    async def _first_accepted(self, pending: dict, timeout: Optional[float]):
+        """Wait for an acceptable result until the timeout, returns (name, result) or None"""
+        deadline = None if timeout is None else asyncio.get_running_loop().time() + timeout
+
+        while pending:
+            remaining = None if deadline is None else max(0.0, deadline - asyncio.get_running_loop().time())
+            done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                return None
+
+            for task in done:
+                name = pending.pop(task)
+                if task.exception() is not None:
+                    logger.debug("Source %s failed: %s", name, task.exception(), extra={'stage': 'search'})
+                    continue
+                if self.accept(task.result()):
+                    return name, task.result()
+
+        return None
+
+    async def resolve(self, *args) -> Tuple[Optional[str], Any]:
+        """Resolve using the fastest acceptable source, returns (source name, result) or (None, None)"""
+        pending = {}
+        try:
+            for index, (name, source) in enumerate(self.sources):
+                if index > 0:
+                    metrics.incr('search.hedged')
+
+                task = asyncio.create_task(self._timed(name, source, *args))
+                pending[task] = name
+
+                is_last = index == len(self.sources) - 1
+                winner = await self._first_accepted(pending, None if is_last else self.hedge_delay(name))
+                if winner:
+                    metrics.incr(f"search.win.{winner[0]}")
+                    return winner
+
+            metrics.incr('search.no_result')
+            return None, None
+
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def summary(self) -> str:
+        """Format per-source latency statistics"""
+        lines = []
+        for name, stats in self.stats.items():
+            p50, p90 = stats.percentile(50), stats.percentile(90)
+            if p50 is None:
+                lines.append(f"{name}: no samples")
+            else:
+                lines.append(
+                    f"{name}: p50 {p50 * 1000:.0f}ms, p90 {p90 * 1000:.0f}ms, "
+                    f"hedge after {self.hedge_delay(name) * 1000:.0f}ms ({len(stats.samples)} samples)"
+                )
+        return '\n'.join(lines)
@@ -1,8 +1,30 @@
+import asyncio
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
 import discord
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Optional
 
+# Extra record attributes that are written as structured fields
+STRUCTURED_FIELDS = ('guild_id', 'stage', 'duration')
+
+# Listener thread that drains the log queue into the real handlers
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Rate limiter and the queue handler its suppressed-message summaries are flushed to
+_rate_limiter: Optional['RateLimitFilter'] = None
+_queue_handler: Optional['StructuredQueueHandler'] = None
+_flush_stop = threading.Event()
+
 
 class DiscordLogHandler(logging.Handler):
     """Custom logging handler that sends logs to a Discord channel"""
@@ -20,9 +42,20 @@ class DiscordLogHandler(logging.Handler):
         except Exception as e:
             print(f"Failed to setup log channel: {e}")
 
+    def get_channel(self, record) -> Optional[discord.abc.Messageable]:
+        """Route guild-scoped records to that guild's log channel, everything else to the bot-wide one"""
+        guild_id = getattr(record, 'guild_id', None)
+        guild_config = getattr(self.bot, 'guild_config', None)
+        if guild_id and guild_config:
+            channel = self.bot.get_channel(guild_config.get(guild_id, 'log_channel_id'))
+            if channel:
+                return channel
+        return self.channel
+
     def emit(self, record):
         """Send log record to Discord channel"""
-        if self.channel is None:
+        channel = self.get_channel(record)
+        if channel is None:
             return
 
         try:
@@ -52,16 +85,122 @@ class DiscordLogHandler(logging.Handler):
             if record.pathname:
                 embed.add_field(name="File", value=record.pathname, inline=False)
 
-            # Schedule the coroutine to send the message
-            import asyncio
-            asyncio.create_task(self.channel.send(embed=embed))
+            # Records are emitted from the listener thread, so hand the send over to the bot's loop
+            asyncio.run_coroutine_threadsafe(channel.send(embed=embed), self.bot.loop)
 
         except Exception as e:
             print(f"Error sending log to Discord: {e}")
 
 
-def setup_logger(name: str = "discord_bot") -> logging.Logger:
-    """Setup and configure logger with console handler only"""
+class JsonFormatter(logging.Formatter):
+    """Formats log records as single-line JSON objects"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+        }
+
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that keeps exception text in its own field instead of folding it into the message"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = (self.formatter or logging.Formatter()).formatException(record.exc_info)
+
+        # Merge args now so the record can safely cross threads, formatters append exc_text themselves
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Lets only a fraction of DEBUG records through"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class RateLimitFilter(logging.Filter):
+    """Suppresses repeated WARNING+ records from the same call site, guild and message within an interval"""
+
+    def __init__(self, interval: float):
+        super().__init__()
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.last_emitted = {}
+        self.suppressed = {}  # key -> [count, last suppressed record]
+
+    @staticmethod
+    def key_for(record):
+        return record.pathname, record.lineno, getattr(record, 'guild_id', None), str(record.msg)
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING or self.interval <= 0:
+            return True
+
+        key = self.key_for(record)
+        now = time.monotonic()
+
+        with self.lock:
+            last = self.last_emitted.get(key)
+            if last is not None and now - last < self.interval:
+                entry = self.suppressed.setdefault(key, [0, None])
+                entry[0] += 1
+                entry[1] = record
+                return False
+
+            self.last_emitted[key] = now
+            entry = self.suppressed.pop(key, None)
+
+        if entry:
+            record.msg = f"{record.msg} (suppressed {entry[0]} similar message(s))"
+        return True
+
+    def flush(self, emit, force: bool = False):
+        """Emit the last suppressed record of every finished window, so counts aren't lost when nothing follows"""
+        now = time.monotonic()
+        with self.lock:
+            expired = [
+                key for key in self.suppressed
+                if force or now - self.last_emitted.get(key, 0) >= self.interval
+            ]
+            entries = [self.suppressed.pop(key) for key in expired]
+
+        for count, record in entries:
+            record.msg = f"{record.msg} (last of {count} suppressed similar message(s))"
+            emit(record)
+
+
+def setup_logger(name: str = "discord_bot", log_dir: str = "logs", max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5, debug_sample_rate: float = 1.0,
+                 rate_limit_interval: float = 10.0) -> logging.Logger:
+    """Setup logger that hands records to a background thread writing to console and a rotating JSON file"""
+    global _listener, _rate_limiter, _queue_handler
 
     # Create logger
     logger = logging.getLogger(name)
@@ -69,6 +208,7 @@ def setup_logger(name: str = "discord_bot") -> logging.Logger:
 
     # Remove any existing handlers
     logger.handlers.clear()
+    stop_logging()
 
     # Console handler
     console_handler = logging.StreamHandler()
@@ -78,13 +218,87 @@ def setup_logger(name: str = "discord_bot") -> logging.Logger:
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
+
+    # Rotating JSON lines file handler
+    os.makedirs(log_dir, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        os.path.join(log_dir, f"{name}.jsonl"),
+        maxBytes=max_bytes,
+        backupCount=backup_count,
+        encoding='utf-8'
+    )
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(JsonFormatter())
+
+    # The logger itself only enqueues records, the listener thread does all the I/O
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    rate_limiter = RateLimitFilter(rate_limit_interval)
+    queue_handler.addFilter(DebugSamplingFilter(debug_sample_rate))
+    queue_handler.addFilter(rate_limiter)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    _listener.start()
+    _rate_limiter, _queue_handler = rate_limiter, queue_handler
+
+    # Periodically report suppressed messages whose window ended without another record arriving
+    if rate_limit_interval > 0:
+        _flush_stop.clear()
+        threading.Thread(
+            target=_flush_suppressed, args=(rate_limit_interval,), name="log-flusher", daemon=True
+        ).start()
+    atexit.register(stop_logging)
 
     return logger
 
 
+def _enqueue_unfiltered(record):
+    if _queue_handler is not None:
+        _queue_handler.enqueue(_queue_handler.prepare(record))
+
+
+def _flush_suppressed(interval: float):
+    while not _flush_stop.wait(interval):
+        if _rate_limiter is not None:
+            _rate_limiter.flush(_enqueue_unfiltered)
+
+
+def stop_logging():
+    """Report suppressed messages, flush queued records and stop the listener thread"""
+    global _listener, _rate_limiter, _queue_handler
+    _flush_stop.set()
+    if _rate_limiter is not None:
+        _rate_limiter.flush(_enqueue_unfiltered, force=True)
+        _rate_limiter = None
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    _queue_handler = None
+
+
+@contextmanager
+def log_stage(logger: logging.Logger, stage: str, guild_id: Optional[int] = None, level: int = logging.DEBUG):
+    """Log how long the wrapped block took, with structured stage and duration fields"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        # stacklevel 3 skips this generator and contextlib, so the record points at the caller
+        logger.log(
+            level, "%s took %.3fs", stage, duration,
+            extra={'guild_id': guild_id, 'stage': stage, 'duration': round(duration, 4)},
+            stacklevel=3
+        )
+
+
 async def add_discord_handler(logger: logging.Logger, bot, channel_id: int):
-    """Add Discord handler to logger after bot is ready"""
+    """Add Discord handler to the log listener after bot is ready"""
     discord_handler = DiscordLogHandler(bot, channel_id)
     await discord_handler.setup()
 
@@ -92,5 +306,8 @@ async def add_discord_handler(logger: logging.Logger, bot, channel_id: int):
     discord_handler.setFormatter(discord_format)
     discord_handler.setLevel(logging.INFO)
 
-    logger.addHandler(discord_handler)
-    logger.discord_handler = discord_handler
\ No newline at end of file
+    if _listener is not None:
+        _listener.handlers = _listener.handlers + (discord_handler,)
+    else:
+        logger.addHandler(discord_handler)
+    logger.discord_handler = discord_handler
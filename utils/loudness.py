@@ -0,0 +1,124 @@
+import asyncio
+import json
+import logging
+import math
+import time
+from typing import Optional
+from utils.track_cache import TrackCache
+
+logger = logging.getLogger("discord_bot")
+
+
+async def measure_loudness(stream_url: str, timeout: float) -> Optional[float]:
+    """Measure a stream's or local file's integrated loudness (LUFS) with a single FFmpeg loudnorm pass"""
+    input_options = []
+    if stream_url.startswith(('http://', 'https://')):
+        # Reconnect options are http-only, ffmpeg rejects them for local (pre-downloaded) files
+        input_options = [
+            '-reconnect', '1', '-reconnect_streamed', '1', '-reconnect_delay_max', '5',
+            '-rw_timeout', '30000000',  # microseconds, gives up on a stalled connection
+        ]
+
+    process = await asyncio.create_subprocess_exec(
+        'ffmpeg', '-hide_banner', '-nostats', *input_options,
+        '-i', stream_url, '-vn', '-af', 'loudnorm=print_format=json', '-f', 'null', '-',
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        _, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        logger.debug("Loudness analysis of %s timed out after %ss", stream_url, timeout,
+                     extra={'stage': 'loudness'})
+        return None
+
+    if process.returncode != 0:
+        return None
+
+    # loudnorm prints its measurements as the last JSON object on stderr
+    output = stderr.decode('utf-8', errors='replace')
+    start, end = output.rfind('{'), output.rfind('}')
+    if start == -1 or end < start:
+        return None
+
+    try:
+        loudness = float(json.loads(output[start:end + 1])['input_i'])
+    except (ValueError, KeyError):
+        return None
+    return loudness if math.isfinite(loudness) else None
+
+
+class LoudnessAnalyzer:
+    """Measures each track's loudness once in the background and turns it into a static gain"""
+
+    def __init__(self, track_cache: TrackCache, target: float, max_gain: float, max_duration: int,
+                 timeout: float, max_attempts: int = 3, retry_delay: float = 3600, concurrency: int = 1):
+        self.track_cache = track_cache
+        self.target = target
+        self.max_gain = max_gain
+        self.max_duration = max_duration
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.pending = set()
+        self.failures = {}  # url -> [failed attempts, monotonic time of the next allowed attempt]
+
+    def gain_for(self, url: str) -> Optional[float]:
+        """Get the gain in dB that brings a track to the target loudness, if it has been measured"""
+        track = self.track_cache.get(url)
+        if not track or track.get('loudness') is None:
+            return None
+
+        gain = self.target - track['loudness']
+        return max(-self.max_gain, min(self.max_gain, gain))
+
+    def should_retry(self, url: str) -> bool:
+        """Check whether a track that failed before may be measured again"""
+        failure = self.failures.get(url)
+        if failure is None:
+            return True
+        attempts, retry_at = failure
+        return attempts < self.max_attempts and time.monotonic() >= retry_at
+
+    def record_failure(self, url: str):
+        """Remember a failed measurement, backing off exponentially before the next attempt"""
+        attempts = self.failures.get(url, [0, 0.0])[0] + 1
+        self.failures[url] = [attempts, time.monotonic() + self.retry_delay * 2 ** (attempts - 1)]
+        if attempts >= self.max_attempts:
+            logger.info("Giving up on measuring loudness of %s after %s attempt(s)", url, attempts,
+                        extra={'stage': 'loudness'})
+
+    def schedule(self, url: str, stream_url: str, duration: int):
+        """Queue a background measurement unless the track is measured, pending, too long or backing off"""
+        if url in self.pending or self.gain_for(url) is not None:
+            return
+        if not duration or duration > self.max_duration:
+            return
+        if not self.should_retry(url):
+            return
+
+        self.pending.add(url)
+        asyncio.create_task(self._analyze(url, stream_url))
+
+    async def _analyze(self, url: str, stream_url: str):
+        try:
+            async with self.semaphore:
+                loudness = await measure_loudness(stream_url, self.timeout)
+
+            if loudness is None:
+                logger.debug("Could not measure loudness of %s", url, extra={'stage': 'loudness'})
+                self.record_failure(url)
+                return
+
+            self.failures.pop(url, None)
+            await self.track_cache.update(url, loudness=round(loudness, 2))
+            logger.debug("Measured loudness of %s: %.1f LUFS", url, loudness, extra={'stage': 'loudness'})
+
+        except Exception as e:
+            logger.warning("Loudness analysis failed for %s: %s", url, e, extra={'stage': 'loudness'})
+            self.record_failure(url)
+        finally:
+            self.pending.discard(url)
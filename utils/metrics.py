@@ -0,0 +1,35 @@
+import threading
+from collections import Counter
+
+
+class Metrics:
+    """Thread-safe in-process counters"""
+
+    def __init__(self):
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1):
+        """Increment a counter"""
+        with self._lock:
+            self.counters[name] += amount
+
+    def get(self, name: str) -> int:
+        """Get the current value of a counter"""
+        return self.counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        """Get a copy of every counter"""
+        with self._lock:
+            return dict(self.counters)
+
+    def summary(self) -> str:
+        """Format every counter as a human readable list"""
+        snapshot = self.snapshot()
+        if not snapshot:
+            return "No metrics recorded yet"
+        return '\n'.join(f"{name}: {value}" for name, value in sorted(snapshot.items()))
+
+
+# Shared registry used across the bot
+metrics = Metrics()
@@ -0,0 +1,155 @@
+import asyncio
+import glob
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Iterable, List, Optional
+from urllib.parse import urlparse, parse_qs
+import yt_dlp
+from utils.metrics import metrics
+
+logger = logging.getLogger("discord_bot")
+
+
+def video_id(url: str) -> Optional[str]:
+    """Extract the YouTube video ID from a watch URL"""
+    ids = parse_qs(urlparse(url).query).get('v')
+    return ids[0] if ids else None
+
+
+class AudioCache:
+    """Downloaded audio files for popular tracks, named by video ID"""
+
+    def __init__(self, directory: str, max_duration: int):
+        self.directory = directory
+        self.max_duration = max_duration
+        self.files = {}  # video id -> path
+
+    def scan(self, keep: Iterable[str]):
+        """Index the files on disk, deleting any that are no longer among the tracks to keep (blocking)"""
+        os.makedirs(self.directory, exist_ok=True)
+        keep_ids = {video_id(url) for url in keep}
+
+        self.files.clear()
+        for path in glob.glob(os.path.join(self.directory, '*.*')):
+            name, ext = os.path.splitext(os.path.basename(path))
+            if name in keep_ids and ext not in ('.part', '.ytdl'):
+                self.files[name] = path
+                continue
+
+            try:
+                os.remove(path)
+                metrics.incr('prewarm.pruned')
+            except OSError as e:
+                logger.warning("Failed to prune cached audio %s: %s", path, e)
+
+    def path_for(self, url: str) -> Optional[str]:
+        """Get the local file for a track, if it has been downloaded"""
+        path = self.files.get(video_id(url))
+        return path if path and os.path.exists(path) else None
+
+    def download(self, url: str) -> Optional[str]:
+        """Download a track's audio unless it is longer than max_duration (blocking)"""
+        opts = {
+            'format': 'bestaudio/best',
+            'quiet': True,
+            'no_warnings': True,
+            'noplaylist': True,
+            'outtmpl': os.path.join(self.directory, '%(id)s.%(ext)s'),
+        }
+        with yt_dlp.YoutubeDL(opts) as ytdl:
+            info = ytdl.extract_info(url, download=False)
+            duration = info.get('duration')
+            if not duration or duration > self.max_duration:
+                metrics.incr('prewarm.download_skipped')
+                return None
+
+            info = ytdl.process_ie_result(info, download=True)
+            path = ytdl.prepare_filename(info)
+
+        self.files[info['id']] = path
+        return path
+
+
+class CacheWarmer:
+    """Low priority background job that resolves popular tracks ahead of time"""
+
+    def __init__(self, resolve: Callable[[str], Awaitable[None]], is_busy: Callable[[], bool],
+                 interval: float, audio_cache: Optional[AudioCache] = None):
+        self.resolve = resolve
+        self.is_busy = is_busy
+        self.interval = interval
+        self.audio_cache = audio_cache
+        self.warmed = set()
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start(self, urls: List[str]):
+        """Start warming the given URLs, most important first"""
+        if self.running or not urls:
+            return
+        self.total, self.done, self.failed = len(urls), 0, 0
+        self.task = asyncio.create_task(self._run(urls))
+
+    def stop(self):
+        """Cancel the warm-up"""
+        if self.running:
+            self.task.cancel()
+
+    async def _wait_until_idle(self):
+        # Never compete with live /play traffic, wait for it to finish first
+        while self.is_busy():
+            await asyncio.sleep(self.interval)
+
+    async def _run(self, urls: List[str]):
+        start = time.perf_counter()
+        logger.info("Pre-warming caches for %s popular track(s)", len(urls), extra={'stage': 'prewarm'})
+
+        for url in urls:
+            await self._wait_until_idle()
+            try:
+                await self.resolve(url)
+                if self.audio_cache and not self.audio_cache.path_for(url):
+                    await self._wait_until_idle()
+                    path = await asyncio.get_running_loop().run_in_executor(None, self.audio_cache.download, url)
+                    if path:
+                        metrics.incr('prewarm.downloaded')
+
+                self.warmed.add(url)
+                metrics.incr('prewarm.resolved')
+            except Exception as e:
+                self.failed += 1
+                metrics.incr('prewarm.failed')
+                logger.debug("Pre-warm failed for %s: %s", url, e, extra={'stage': 'prewarm'})
+
+            self.done += 1
+            if self.done % 10 == 0:
+                logger.info("Pre-warm progress: %s/%s", self.done, self.total, extra={'stage': 'prewarm'})
+            await asyncio.sleep(self.interval)
+
+        duration = time.perf_counter() - start
+        logger.info(
+            "Pre-warm finished: %s warmed, %s failed in %.1fs", len(self.warmed), self.failed, duration,
+            extra={'stage': 'prewarm', 'duration': round(duration, 2)}
+        )
+
+    def record_play(self, url: str):
+        """Count whether a played track had been pre-warmed"""
+        metrics.incr('prewarm.hit' if url in self.warmed else 'prewarm.miss')
+
+    def summary(self) -> str:
+        """Format warm-up progress and hit rate"""
+        hits, misses = metrics.get('prewarm.hit'), metrics.get('prewarm.miss')
+        plays = hits + misses
+        hit_rate = f"{hits / plays:.0%}" if plays else "n/a"
+        state = "running" if self.running else "idle"
+        return (
+            f"Pre-warm {state}: {self.done}/{self.total} done, {self.failed} failed\n"
+            f"Plays served from pre-warmed tracks: {hits}/{plays} ({hit_rate})"
+        )
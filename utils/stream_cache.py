@@ -0,0 +1,56 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+
+class StreamCache:
+    """LRU cache of resolved media stream URLs keyed by the song's webpage URL"""
+
+    def __init__(self, max_size: int = 1000, default_ttl: float = 1800, safety_margin: float = 120):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.safety_margin = safety_margin
+        self.entries = OrderedDict()  # webpage url -> (stream url, expires at)
+        self.hits = 0
+        self.misses = 0
+
+    def expiry_for(self, stream_url: str) -> float:
+        """Work out when a stream URL stops being usable, using its expire parameter when present"""
+        expire = parse_qs(urlparse(stream_url).query).get('expire')
+        if expire:
+            try:
+                return float(expire[0]) - self.safety_margin
+            except ValueError:
+                pass
+        return time.time() + self.default_ttl
+
+    def get(self, url: str) -> Optional[str]:
+        """Get a cached stream URL if it has not expired"""
+        entry = self.entries.get(url)
+        if entry is None or entry[1] <= time.time():
+            self.entries.pop(url, None)
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(url)
+        self.hits += 1
+        return entry[0]
+
+    def peek(self, url: str) -> Optional[str]:
+        """Get a cached stream URL if it has not expired, without counting a hit or miss or touching LRU order"""
+        entry = self.entries.get(url)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    def put(self, url: str, stream_url: str):
+        """Cache a stream URL for a webpage URL"""
+        self.entries[url] = (stream_url, self.expiry_for(stream_url))
+        self.entries.move_to_end(url)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, url: str):
+        """Drop a cached stream URL, e.g. after the server rejected it"""
+        self.entries.pop(url, None)
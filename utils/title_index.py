@@ -0,0 +1,134 @@
+import bisect
+import difflib
+import re
+from typing import List, Optional, Tuple
+from utils.track_cache import TrackCache
+
+WORD_RE = re.compile(r"\w+")
+
+# Upper bound on URLs collected for a single prefix, keeps very short prefixes cheap
+MAX_PREFIX_MATCHES = 2000
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase words"""
+    return WORD_RE.findall(text.casefold())
+
+
+class TitleIndex:
+    """In-memory prefix and fuzzy index over the titles in the track cache"""
+
+    def __init__(self, track_cache: TrackCache):
+        self.track_cache = track_cache
+        self.titles = {}  # url -> title
+        self.tokens = []  # sorted (token, url) pairs for prefix lookups
+        self.vocabulary = {}  # first character -> tokens, for fuzzy lookups
+        self.token_counts = {}  # token -> number of indexed URLs using it
+
+    def build(self):
+        """Rebuild the index from every title currently in the track cache"""
+        self.titles.clear()
+        self.vocabulary.clear()
+        self.token_counts.clear()
+
+        # Sorting once is far cheaper than an insort per token for the whole cache
+        pairs = []
+        for url, track in self.track_cache.tracks.items():
+            if track.get('title'):
+                self.titles[url] = track['title']
+                for token in set(tokenize(track['title'])):
+                    pairs.append((token, url))
+                    self._count(token)
+        pairs.sort()
+        self.tokens = pairs
+
+    def _count(self, token: str):
+        self.token_counts[token] = self.token_counts.get(token, 0) + 1
+        self.vocabulary.setdefault(token[0], set()).add(token)
+
+    def _uncount(self, token: str):
+        self.token_counts[token] -= 1
+        if self.token_counts[token] > 0:
+            return
+        del self.token_counts[token]
+        tokens = self.vocabulary[token[0]]
+        tokens.discard(token)
+        if not tokens:
+            del self.vocabulary[token[0]]
+
+    def on_track_updated(self, url: str, track: dict):
+        """Track cache listener that keeps the index in sync"""
+        if track.get('title'):
+            self.add(url, track['title'])
+
+    def add(self, url: str, title: str):
+        """Index a title, replacing any previous title for the URL"""
+        if self.titles.get(url) == title:
+            return
+        if url in self.titles:
+            self.remove(url)
+
+        self.titles[url] = title
+        for token in set(tokenize(title)):
+            bisect.insort(self.tokens, (token, url))
+            self._count(token)
+
+    def remove(self, url: str):
+        """Remove a URL from the index"""
+        title = self.titles.pop(url, None)
+        if title is None:
+            return
+
+        for token in set(tokenize(title)):
+            index = bisect.bisect_left(self.tokens, (token, url))
+            if index < len(self.tokens) and self.tokens[index] == (token, url):
+                del self.tokens[index]
+            self._uncount(token)
+
+    def _prefix(self, prefix: str) -> set:
+        urls = set()
+        index = bisect.bisect_left(self.tokens, (prefix, ''))
+        while index < len(self.tokens) and self.tokens[index][0].startswith(prefix):
+            urls.add(self.tokens[index][1])
+            if len(urls) >= MAX_PREFIX_MATCHES:
+                break
+            index += 1
+        return urls
+
+    def _fuzzy(self, word: str) -> set:
+        urls = set()
+        candidates = self.vocabulary.get(word[0], ())
+        for token in difflib.get_close_matches(word, candidates, n=5, cutoff=0.75):
+            urls |= self._prefix(token)
+        return urls
+
+    def _match(self, words: List[str], fuzzy: bool) -> set:
+        matches = None
+        for word in words:
+            urls = self._prefix(word)
+            if fuzzy and len(word) >= 3:
+                urls |= self._fuzzy(word)
+            matches = urls if matches is None else matches & urls
+            if not matches:
+                break
+        return matches or set()
+
+    def search(self, query: str, guild_id: Optional[int] = None, limit: int = 25) -> List[Tuple[str, str]]:
+        """Find (url, title) pairs for a partial query, favouring the guild's own history"""
+        history = self.track_cache.history.get(guild_id, {}) if guild_id else {}
+        words = tokenize(query)
+
+        if not words:
+            recent = self.track_cache.recent(guild_id, limit) if guild_id else []
+            return [(url, self.titles[url]) for url in recent if url in self.titles]
+
+        def rank(urls) -> List[str]:
+            return sorted(urls, key=lambda url: tuple(history.get(url, (0, 0.0))), reverse=True)
+
+        results = rank(self._match(words, fuzzy=False))[:limit]
+        if len(results) < limit:
+            # Fall back to typo-tolerant matching only when prefixes alone don't fill the list
+            exact = set(results)
+            results += rank(self._match(words, fuzzy=True) - exact)[:limit - len(results)]
+
+        return [(url, self.titles[url]) for url in results]
@@ -0,0 +1,108 @@
+import logging
+import time
+from typing import Callable, Optional
+from utils.database import Database, SQLiteStore
+
+logger = logging.getLogger("discord_bot")
+
+
+class TrackCache(SQLiteStore):
+    """Per-track metadata and per-guild play history persisted in SQLite and served from memory"""
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS tracks ("
+        "url TEXT PRIMARY KEY, title TEXT, duration INTEGER, thumbnail TEXT, "
+        "loudness REAL, updated_at REAL)",
+        "CREATE TABLE IF NOT EXISTS play_history ("
+        "guild_id INTEGER NOT NULL, url TEXT NOT NULL, play_count INTEGER NOT NULL, "
+        "last_played REAL NOT NULL, PRIMARY KEY (guild_id, url))",
+    )
+
+    FIELDS = ('title', 'duration', 'thumbnail', 'loudness')
+
+    def __init__(self, database: Database):
+        super().__init__(database)
+        self.tracks = {}  # webpage url -> {field: value}
+        self.history = {}  # guild_id -> {webpage url: [play count, last played]}
+
+    def _read_all(self, conn):
+        self._create_schema(conn)
+        tracks = conn.execute("SELECT url, title, duration, thumbnail, loudness FROM tracks").fetchall()
+        history = conn.execute("SELECT guild_id, url, play_count, last_played FROM play_history").fetchall()
+        return tracks, history
+
+    def _write(self, conn, url: str, track: dict):
+        conn.execute(
+            "INSERT OR REPLACE INTO tracks (url, title, duration, thumbnail, loudness, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (url, *(track.get(field) for field in self.FIELDS), time.time())
+        )
+        conn.commit()
+
+    @staticmethod
+    def _write_play(conn, guild_id: int, url: str, play_count: int, last_played: float):
+        conn.execute(
+            "INSERT OR REPLACE INTO play_history (guild_id, url, play_count, last_played) "
+            "VALUES (?, ?, ?, ?)",
+            (guild_id, url, play_count, last_played)
+        )
+        conn.commit()
+
+    async def load(self):
+        """Open the database and fill the cache with every stored track and play"""
+        tracks, history = await self._run(self._read_all)
+
+        self.tracks.clear()
+        for url, *values in tracks:
+            self.tracks[url] = dict(zip(self.FIELDS, values))
+
+        self.history.clear()
+        for guild_id, url, play_count, last_played in history:
+            self.history.setdefault(guild_id, {})[url] = [play_count, last_played]
+        logger.info("Loaded metadata for %s track(s) and history for %s guild(s)",
+                    len(self.tracks), len(self.history))
+
+    def get(self, url: str) -> Optional[dict]:
+        """Get cached metadata for a track"""
+        return self.tracks.get(url)
+
+    async def update(self, url: str, **fields):
+        """Merge fields into a track's metadata and persist it"""
+        unknown = set(fields) - set(self.FIELDS)
+        if unknown:
+            raise KeyError(f"Unknown track field(s): {', '.join(sorted(unknown))}")
+
+        track = self.tracks.setdefault(url, dict.fromkeys(self.FIELDS))
+        if all(track.get(field) == value for field, value in fields.items()):
+            return
+        track.update(fields)
+
+        self.notify(url, track)
+        await self._run(self._write, url, dict(track))
+
+    async def record_play(self, guild_id: int, url: str):
+        """Count a play of a track in a guild"""
+        entry = self.history.setdefault(guild_id, {}).setdefault(url, [0, 0.0])
+        entry[0] += 1
+        entry[1] = time.time()
+
+        await self._run(self._write_play, guild_id, url, *entry)
+
+    def recent(self, guild_id: int, limit: int = 25) -> list:
+        """Get a guild's most recently played track URLs"""
+        history = self.history.get(guild_id, {})
+        return sorted(history, key=lambda url: history[url][1], reverse=True)[:limit]
+
+    def popular(self, limit: int, half_life: float) -> list:
+        """Get the most played track URLs across guilds, with older plays decaying by half every half_life seconds"""
+        now = time.time()
+        scores = {}
+        for history in self.history.values():
+            for url, (play_count, last_played) in history.items():
+                weight = 0.5 ** ((now - last_played) / half_life)
+                scores[url] = scores.get(url, 0.0) + play_count * weight
+        return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+    def add_listener(self, listener: Callable[[str, dict], None]):
+        """Register a callback invoked as listener(url, track) whenever a track's metadata changes"""
+        super().add_listener(listener)
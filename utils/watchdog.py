@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Optional
+
+logger = logging.getLogger("discord_bot")
+
+# Upper bounds (in seconds) of the lag histogram buckets
+LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float('inf'))
+
+
+class LoopWatchdog:
+    """Measures event loop scheduling lag and logs where the loop was blocked"""
+
+    def __init__(self, interval: float = 0.5, threshold: float = 0.25,
+                 window: int = 1200, report_cooldown: float = 30.0):
+        self.interval = interval
+        self.threshold = threshold
+        self.report_cooldown = report_cooldown
+        self.samples = deque(maxlen=window)
+        self.max_lag = 0.0
+        self.stalls = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._last_beat = 0.0
+        self._stall_reported = False
+        self._last_report = 0.0
+
+    def start(self):
+        """Start the heartbeat task and monitor thread (must be called from the event loop)"""
+        if self._task is not None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop_event.clear()
+
+        self._task = self._loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info("Event loop watchdog started (threshold %.0fms)", self.threshold * 1000)
+
+    def stop(self):
+        """Stop the heartbeat task and monitor thread"""
+        self._stop_event.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._thread = None
+
+    async def _heartbeat(self):
+        """Sleep for a fixed interval and record how late the loop woke us up"""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            self._last_beat = time.monotonic()
+
+            if lag >= self.threshold:
+                logger.warning("Event loop lag of %.0fms detected", lag * 1000)
+            self._stall_reported = False
+
+    def _monitor(self):
+        """Watch heartbeats from a separate thread and capture the loop stack on a stall"""
+        poll = min(self.threshold / 2, 0.1)
+        while not self._stop_event.wait(poll):
+            overdue = time.monotonic() - self._last_beat - self.interval
+            if overdue < self.threshold or self._stall_reported:
+                continue
+
+            self._stall_reported = True
+            self.stalls += 1
+
+            now = time.monotonic()
+            if now - self._last_report < self.report_cooldown:
+                continue
+            self._last_report = now
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = ''.join(traceback.format_stack(frame))
+            logger.warning(
+                "Event loop blocked for %.0fms, loop thread stack:\n%s",
+                overdue * 1000, stack
+            )
+
+    def percentile(self, percent: float) -> float:
+        """Return the given percentile of the recent lag samples"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+    def histogram(self) -> dict:
+        """Return a bucketed histogram of the recent lag samples"""
+        counts = {bound: 0 for bound in LAG_BUCKETS}
+        for lag in self.samples:
+            for bound in LAG_BUCKETS:
+                if lag <= bound:
+                    counts[bound] += 1
+                    break
+
+        return {
+            ('+Inf' if bound == float('inf') else f"<={bound * 1000:g}ms"): count
+            for bound, count in counts.items()
+        }
+
+    def summary(self) -> str:
+        """Format a short human readable summary of the lag statistics"""
+        lines = [
+            f"samples: {len(self.samples)}",
+            f"p50: {self.percentile(50) * 1000:.1f}ms",
+            f"p99: {self.percentile(99) * 1000:.1f}ms",
+            f"max: {self.max_lag * 1000:.1f}ms",
+            f"stalls: {self.stalls}",
+        ]
+        lines.extend(f"{label}: {count}" for label, count in self.histogram().items())
+        return '\n'.join(lines)